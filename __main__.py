@@ -0,0 +1,6 @@
+# ecc/__main__.py
+import sys
+
+from ecc.cli import main
+
+sys.exit(main())
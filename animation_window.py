@@ -2,11 +2,12 @@ from PyQt5.QtWidgets import (
     QWidget, QLabel, QVBoxLayout, QPushButton, QProgressBar, QHBoxLayout
 )
 from PyQt5.QtCore import QTimer
-from ecc.hamming import hamming_encode, hamming_decode
+from ecc.hamming import DEFAULT_CODE
 from ecc.convolutional import conv_encode, conv_decode
 from ecc.reed_solomon import rs_encode, rs_decode
 from ecc.noise import flip_random_bits
 import random
+import numpy as np
 from PyQt5.QtCore import Qt
 
 class AnimationWindow(QWidget):
@@ -73,42 +74,34 @@ class AnimationWindow(QWidget):
             self.animate_reed_solomon()
 
     def animate_hamming(self):
-        self.steps.append(f"Input 4-bit data: {self.data}")
+        code = DEFAULT_CODE
+        self.steps.append(f"Input {code.k}-bit data: {self.data}")
 
-        d = list(map(int, self.data))
-        p1 = d[0] ^ d[1] ^ d[3]
-        p2 = d[0] ^ d[2] ^ d[3]
-        p3 = d[1] ^ d[2] ^ d[3]
-        encoded = f"{p1}{p2}{d[0]}{p3}{d[1]}{d[2]}{d[3]}"
+        d = np.frombuffer(self.data.encode(), dtype=np.uint8) - ord('0')
+        codeword = code.encode(d)[0]
+        parity = codeword[code.parity_positions]
+        encoded = ''.join(map(str, codeword))
         self.encoded = encoded
 
-        self.steps.append(f"Calculated parity bits:\nP1={p1}, P2={p2}, P3={p3}")
-        self.steps.append(f"7-bit Encoded data:\n{encoded}")
+        parity_text = ", ".join(f"P{i + 1}={p}" for i, p in enumerate(parity))
+        self.steps.append(f"Calculated parity bits:\n{parity_text}")
+        self.steps.append(f"{code.n}-bit Encoded data:\n{encoded}")
 
         flip_index = random.randint(0, len(encoded) - 1)
-        noisy = list(encoded)
-        noisy[flip_index] = '1' if noisy[flip_index] == '0' else '0'
-        noisy = ''.join(noisy)
-        self.noisy = noisy
+        noisy = codeword.copy()
+        noisy[flip_index] ^= 1
+        self.noisy = ''.join(map(str, noisy))
         self.flip_index = flip_index
 
-        self.steps.append(f"Introduced error by flipping bit {flip_index+1}:\n{noisy}")
+        self.steps.append(f"Introduced error by flipping bit {flip_index+1}:\n{self.noisy}")
 
-        e = list(map(int, noisy))
-        s1 = e[0] ^ e[2] ^ e[4] ^ e[6]
-        s2 = e[1] ^ e[2] ^ e[5] ^ e[6]
-        s3 = e[3] ^ e[4] ^ e[5] ^ e[6]
-        error_pos = s1 * 1 + s2 * 2 + s3 * 4
+        error_pos = int(code.syndrome(noisy)[0])
         self.steps.append(f"Detected error at position: {error_pos}")
 
-        corrected = list(noisy)
-        if error_pos != 0:
-            corrected[error_pos - 1] = '1' if corrected[error_pos - 1] == '0' else '0'
-        corrected = ''.join(corrected)
-
-        decoded = f"{corrected[2]}{corrected[4]}{corrected[5]}{corrected[6]}"
-        self.steps.append(f"Corrected data: {corrected}")
-        self.steps.append(f"Recovered original 4-bit data: {decoded}")
+        corrected = noisy ^ code.correction[error_pos]
+        decoded, _ = code.decode(noisy)
+        self.steps.append(f"Corrected data: {''.join(map(str, corrected))}")
+        self.steps.append(f"Recovered original {code.k}-bit data: {''.join(map(str, decoded[0]))}")
 
     def animate_convolutional(self):
         self.steps.append(f"Input binary data: {self.data}")
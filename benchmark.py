@@ -0,0 +1,406 @@
+# ecc/benchmark.py
+# Throughput and memory benchmarks for the codec and noise entry points:
+#
+#   python -m ecc.benchmark --save baseline.json
+#   python -m ecc.benchmark --baseline baseline.json --threshold 0.15
+#
+# (also available as `python -m ecc bench`). Each case runs over every
+# message length x batch size; a call processes `batch` frames of `length`
+# information bits, through the string API one frame at a time or through
+# the array API in one call. Rerunning against a saved baseline reports
+# every result whose throughput dropped or memory peak grew by more than the
+# threshold, and exits with status 1 if there are any.
+#
+#   python -m ecc.benchmark --startup --startup-budget 1.5
+#
+# instead times GUI cold starts (a fresh interpreter up to the shown main
+# window, on Qt's offscreen platform) and fails if the best of them is over
+# budget or the window pulled in a module it is meant to load lazily.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from fnmatch import fnmatch
+
+import numpy as np
+
+from ecc import channel, noise
+from ecc.bitbuffer import BitBuffer
+from ecc.convolutional import DEFAULT_CODE, conv_decode, conv_encode
+from ecc.hamming import (SECDED_72_64, hamming_decode, hamming_decode_batch, hamming_encode,
+                         hamming_encode_batch)
+from ecc.pipeline import concatenated
+from ecc.reed_solomon import rs_decode, rs_decode_chunked, rs_encode, rs_encode_chunked
+
+DEFAULT_LENGTHS = (64, 1024, 8192)
+DEFAULT_BATCHES = (1, 64)
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_STARTUP_BUDGET = 1.0  # seconds from process start to the window shown
+
+# Run in a fresh interpreter; prints the seconds to import ui.window and to
+# show the window, then the deferred modules that were loaded anyway.
+_STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from ui import window
+imported = time.perf_counter()
+app = QApplication(['startup-check'])
+main = window.ECCWindow()
+main.show()
+app.processEvents()
+shown = time.perf_counter()
+print(imported - started, shown - started)
+print(' '.join(m for m in window.DEFERRED_MODULES if m in sys.modules))
+"""
+
+Case = namedtuple('Case', ['name', 'prepare'])
+# prepare(length, batch, rng) -> zero-argument callable doing one run
+
+
+def _bit_strings(rng, length, batch):
+    bits = rng.integers(0, 2, (batch, length), dtype=np.uint8)
+    return bits, [(row + ord('0')).tobytes().decode() for row in bits]
+
+
+def _nibbles(strings):
+    return [s[i:i + 4] for s in strings for i in range(0, len(s), 4)]
+
+
+def _text(rng, length, batch):
+    # length bits of ASCII letters, so rs_decode can return it as text
+    return [rng.integers(97, 123, length // 8, dtype=np.uint8).tobytes().decode() for _ in range(batch)]
+
+
+def _prepare_hamming_encode(length, batch, rng):
+    nibbles = _nibbles(_bit_strings(rng, length, batch)[1])
+    return lambda: [hamming_encode(n) for n in nibbles]
+
+
+def _prepare_hamming_decode(length, batch, rng):
+    codewords = [hamming_encode(n) for n in _nibbles(_bit_strings(rng, length, batch)[1])]
+    return lambda: [hamming_decode(c) for c in codewords]
+
+
+def _prepare_hamming_encode_batch(length, batch, rng):
+    bits = _bit_strings(rng, length, batch)[0].reshape(-1, 4)
+    return lambda: hamming_encode_batch(bits)
+
+
+def _prepare_hamming_decode_batch(length, batch, rng):
+    encoded = hamming_encode_batch(_bit_strings(rng, length, batch)[0].reshape(-1, 4))
+    return lambda: hamming_decode_batch(encoded)
+
+
+def _prepare_secded_encode_bytes(length, batch, rng):
+    payload = rng.integers(0, 256, length * batch // 8, dtype=np.uint8).tobytes()
+    return lambda: SECDED_72_64.encode_bytes(payload)
+
+
+def _prepare_secded_decode_bytes(length, batch, rng):
+    payload = rng.integers(0, 256, length * batch // 8, dtype=np.uint8).tobytes()
+    encoded = SECDED_72_64.encode_bytes(payload)
+    return lambda: SECDED_72_64.decode_bytes(encoded, len(payload))
+
+
+def _prepare_conv_encode(length, batch, rng):
+    strings = _bit_strings(rng, length, batch)[1]
+    return lambda: [conv_encode(s) for s in strings]
+
+
+def _prepare_conv_decode(length, batch, rng):
+    encoded = [conv_encode(s) for s in _bit_strings(rng, length, batch)[1]]
+    return lambda: [conv_decode(e) for e in encoded]
+
+
+def _prepare_conv_encode_bitbuffer(length, batch, rng):
+    buffers = [BitBuffer.from_bits(row) for row in _bit_strings(rng, length, batch)[0]]
+    return lambda: [conv_encode(b) for b in buffers]
+
+
+def _prepare_conv_decode_bitbuffer(length, batch, rng):
+    encoded = [conv_encode(BitBuffer.from_bits(row)) for row in _bit_strings(rng, length, batch)[0]]
+    return lambda: [conv_decode(e) for e in encoded]
+
+
+def _prepare_conv_encode_batch(length, batch, rng):
+    bits = _bit_strings(rng, length, batch)[0]
+    return lambda: DEFAULT_CODE.encode(bits)
+
+
+def _prepare_conv_decode_batch(length, batch, rng):
+    encoded = DEFAULT_CODE.encode(_bit_strings(rng, length, batch)[0])
+    return lambda: DEFAULT_CODE.decode(encoded)
+
+
+def _prepare_pipeline_encode(length, batch, rng):
+    pipe = concatenated(frame_bits=length)
+    bits = _bit_strings(rng, pipe.data_bits, batch)[0]
+    return lambda: pipe.encode(bits)
+
+
+def _prepare_pipeline_decode(length, batch, rng):
+    pipe = concatenated(frame_bits=length)
+    encoded = pipe.encode(_bit_strings(rng, pipe.data_bits, batch)[0])
+    return lambda: pipe.decode(encoded)
+
+
+def _prepare_rs_encode(length, batch, rng):
+    texts = _text(rng, length, batch)
+    return lambda: [rs_encode(t) for t in texts]
+
+
+def _prepare_rs_decode(length, batch, rng):
+    encoded = [rs_encode(t) for t in _text(rng, length, batch)]
+    return lambda: [rs_decode(e) for e in encoded]
+
+
+def _prepare_rs_encode_chunked(length, batch, rng):
+    payload = ''.join(_text(rng, length, batch)).encode()
+    return lambda: rs_encode_chunked(payload)
+
+
+def _prepare_rs_decode_chunked(length, batch, rng):
+    encoded = rs_encode_chunked(''.join(_text(rng, length, batch)).encode())
+    return lambda: rs_decode_chunked(encoded)
+
+
+def _noise_case(fn, **kwargs):
+    def prepare(length, batch, rng):
+        strings = _bit_strings(rng, length, batch)[1]
+        return lambda: [fn(s, rng=rng, **kwargs) for s in strings]
+    return prepare
+
+
+def _channel_case(fn, *args):
+    def prepare(length, batch, rng):
+        bits = _bit_strings(rng, length, batch)[0]
+        return lambda: fn(bits, *args, rng=rng)
+    return prepare
+
+
+CASES = [
+    Case('hamming_encode', _prepare_hamming_encode),
+    Case('hamming_decode', _prepare_hamming_decode),
+    Case('hamming_encode_batch', _prepare_hamming_encode_batch),
+    Case('hamming_decode_batch', _prepare_hamming_decode_batch),
+    Case('secded_encode_bytes', _prepare_secded_encode_bytes),
+    Case('secded_decode_bytes', _prepare_secded_decode_bytes),
+    Case('conv_encode', _prepare_conv_encode),
+    Case('conv_decode', _prepare_conv_decode),
+    Case('conv_encode_bitbuffer', _prepare_conv_encode_bitbuffer),
+    Case('conv_decode_bitbuffer', _prepare_conv_decode_bitbuffer),
+    Case('conv_encode_batch', _prepare_conv_encode_batch),
+    Case('conv_decode_batch', _prepare_conv_decode_batch),
+    Case('pipeline_encode', _prepare_pipeline_encode),
+    Case('pipeline_decode', _prepare_pipeline_decode),
+    Case('rs_encode', _prepare_rs_encode),
+    Case('rs_decode', _prepare_rs_decode),
+    Case('rs_encode_chunked', _prepare_rs_encode_chunked),
+    Case('rs_decode_chunked', _prepare_rs_decode_chunked),
+    Case('flip_random_bits', _noise_case(noise.flip_random_bits, flip_count=2)),
+    Case('burst_flip', _noise_case(noise.burst_flip, burst_length=3)),
+    Case('interleaved_burst_flip', _noise_case(noise.interleaved_burst_flip, burst_length=3)),
+    Case('gaussian_flip', _noise_case(noise.gaussian_flip, intensity=0.1)),
+    Case('binary_symmetric', _channel_case(channel.binary_symmetric, 0.1)),
+    Case('burst_errors', _channel_case(channel.burst_errors, 3)),
+]
+
+
+def measure(run, min_time=0.2, max_repeat=50):
+    """Best seconds per call over repeated runs (at least one, then until
+    min_time has passed or max_repeat calls), and the tracemalloc peak of
+    one extra call."""
+    best = float('inf')
+    started = time.perf_counter()
+    for _ in range(max_repeat):
+        t = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - t)
+        if time.perf_counter() - started >= min_time:
+            break
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def result_key(result):
+    return f"{result['case']}/{result['length']}x{result['batch']}"
+
+
+def run_benchmarks(patterns=('*',), lengths=DEFAULT_LENGTHS, batches=DEFAULT_BATCHES,
+                   min_time=0.2, seed=0):
+    """Benchmark every case whose name matches one of the glob patterns."""
+    results = []
+    for case in CASES:
+        if not any(fnmatch(case.name, p) for p in patterns):
+            continue
+        for length in lengths:
+            for batch in batches:
+                rng = np.random.default_rng(seed)
+                seconds, peak = measure(case.prepare(length, batch, rng), min_time)
+                results.append({
+                    'case': case.name,
+                    'length': length,
+                    'batch': batch,
+                    'seconds': seconds,
+                    'bits_per_s': length * batch / seconds,
+                    'frames_per_s': batch / seconds,
+                    'peak_bytes': peak,
+                })
+    return results
+
+
+def save_baseline(results, path):
+    baseline = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': {result_key(r): r for r in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """Regressions against a baseline: results whose bits/s fell, or whose
+    memory peak rose, by more than `threshold` (a fraction)."""
+    regressions = []
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None:
+            continue
+        speed = result['bits_per_s'] / old['bits_per_s'] - 1
+        if speed < -threshold:
+            regressions.append({'key': result_key(result), 'metric': 'bits_per_s',
+                                'baseline': old['bits_per_s'], 'current': result['bits_per_s'],
+                                'change': speed})
+        if old['peak_bytes'] and result['peak_bytes'] / old['peak_bytes'] - 1 > threshold:
+            regressions.append({'key': result_key(result), 'metric': 'peak_bytes',
+                                'baseline': old['peak_bytes'], 'current': result['peak_bytes'],
+                                'change': result['peak_bytes'] / old['peak_bytes'] - 1})
+    return regressions
+
+
+def format_table(results):
+    lines = [f"{'case':<24}{'length':>8}{'batch':>7}{'Mbit/s':>11}{'frames/s':>13}{'peak KiB':>11}"]
+    for r in results:
+        lines.append(f"{r['case']:<24}{r['length']:>8}{r['batch']:>7}{r['bits_per_s'] / 1e6:>11.3f}"
+                     f"{r['frames_per_s']:>13.1f}{r['peak_bytes'] / 1024:>11.1f}")
+    return '\n'.join(lines)
+
+
+def measure_startup(repeat=3):
+    """Best of `repeat` GUI cold starts: total seconds including interpreter
+    start-up, seconds to import ui.window and to show the window within
+    the process, and the deferred modules loaded before the window showed."""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen',
+               PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        done = subprocess.run([sys.executable, '-c', _STARTUP_SCRIPT], env=env,
+                              capture_output=True, text=True)
+        total = time.perf_counter() - started
+        if done.returncode:
+            raise RuntimeError(f"GUI start-up failed:\n{done.stderr.strip()}")
+        times, loaded = (done.stdout.splitlines() + [''])[:2]
+        imported, shown = map(float, times.split())
+        if best is None or total < best['total_seconds']:
+            best = {'total_seconds': total, 'import_seconds': imported,
+                    'window_seconds': shown, 'deferred_loaded': loaded.split()}
+    return best
+
+
+def check_startup(budget=DEFAULT_STARTUP_BUDGET, repeat=3):
+    """measure_startup() and the list of budget violations found."""
+    startup = measure_startup(repeat)
+    problems = []
+    if startup['total_seconds'] > budget:
+        problems.append(f"cold start took {startup['total_seconds']:.3f} s, budget {budget:.3f} s")
+    if startup['deferred_loaded']:
+        problems.append(f"loaded before the window showed: {', '.join(startup['deferred_loaded'])}")
+    return startup, problems
+
+
+def run_startup(args):
+    try:
+        startup, problems = check_startup(args.startup_budget)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    if args.format == 'json':
+        json.dump({'startup': startup, 'problems': problems}, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(f"cold start {startup['total_seconds'] * 1e3:.0f} ms "
+              f"(import {startup['import_seconds'] * 1e3:.0f} ms, "
+              f"window shown {startup['window_seconds'] * 1e3:.0f} ms in process)")
+        for problem in problems:
+            print(f"STARTUP {problem}")
+    return 1 if problems else 0
+
+
+def add_arguments(parser):
+    parser.add_argument('--cases', nargs='+', default=['*'],
+                        help='glob patterns of case names (default: all)')
+    parser.add_argument('--lengths', type=int, nargs='+', default=list(DEFAULT_LENGTHS),
+                        help='message lengths in bits')
+    parser.add_argument('--batches', type=int, nargs='+', default=list(DEFAULT_BATCHES))
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds to repeat each run for')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['table', 'json'], default='table')
+    parser.add_argument('--save', default=None, help='write the results as a baseline file')
+    parser.add_argument('--baseline', default=None, help='compare against this baseline file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative change that counts as a regression')
+    parser.add_argument('--startup', action='store_true',
+                        help='check GUI cold start time instead of codec throughput')
+    parser.add_argument('--startup-budget', type=float, default=DEFAULT_STARTUP_BUDGET,
+                        help='seconds allowed from process start to the window shown')
+
+
+def run(args):
+    if args.startup:
+        return run_startup(args)
+    results = run_benchmarks(args.cases, args.lengths, args.batches, args.min_time, args.seed)
+    regressions = compare(results, load_baseline(args.baseline), args.threshold) if args.baseline else []
+    if args.format == 'json':
+        json.dump({'results': results, 'regressions': regressions}, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        print(format_table(results))
+        for r in regressions:
+            print(f"REGRESSION {r['key']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g} "
+                  f"({r['change']:+.1%})")
+    if args.save:
+        save_baseline(results, args.save)
+    return 1 if regressions else 0
+
+
+def main(argv=None, prog='python -m ecc.benchmark'):
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description='Benchmark codec and noise throughput.')
+    add_arguments(parser)
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,184 @@
+# ecc/bitbuffer.py
+# Bit sequences packed eight to a byte (MSB first, as np.packbits), for
+# passing frames between the codecs without a byte or a str character per
+# bit. Slices are views: they share the packed array and only move the bit
+# offset and length, so cutting a stream into chunks copies nothing. The
+# buffer converts to unpacked 0/1 arrays through __array__, so everything
+# taking bit arrays (ecc.channel, ecc.interleaver, ConvolutionalCode)
+# accepts it as is, and to bytes through __bytes__ for the RS byte codecs.
+import numpy as np
+
+POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+POPCOUNT.setflags(write=False)
+
+
+class BitBuffer:
+    __slots__ = ('_data', '_offset', '_length')
+
+    def __init__(self, data=b'', length=None, offset=0):
+        """Wrap packed bytes (bytes, bytearray, memoryview or a uint8 array,
+        not copied); `length` bits from bit `offset`, by default all of them."""
+        if isinstance(data, np.ndarray):
+            data = data.reshape(-1).view(np.uint8)
+        else:
+            data = np.frombuffer(data, dtype=np.uint8)
+        available = len(data) * 8 - offset
+        if length is None:
+            length = available
+        if offset < 0 or not 0 <= length <= available:
+            raise ValueError(f"{length} bits at offset {offset} do not fit in {len(data)} bytes")
+        self._data = data
+        self._offset = offset
+        self._length = length
+
+    @classmethod
+    def from_bits(cls, bits):
+        """Pack a 0/1 array (any integer dtype, flattened)."""
+        bits = np.asarray(bits, dtype=np.uint8).reshape(-1)
+        return cls(np.packbits(bits), len(bits))
+
+    @classmethod
+    def from_str(cls, text):
+        """Pack a legacy '0'/'1' string."""
+        return cls.from_bits(np.frombuffer(text.encode(), dtype=np.uint8) - ord('0'))
+
+    @classmethod
+    def zeros(cls, length):
+        return cls(np.zeros(-(-length // 8), dtype=np.uint8), length)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def size(self):
+        # bits, as for an unpacked array (what profiling.bit_count reads)
+        return self._length
+
+    @property
+    def nbytes(self):
+        return -(-self._length // 8)
+
+    def _window(self):
+        # the packed bytes covering the buffer, and the bit offset into them
+        first = self._offset // 8
+        last = -(-(self._offset + self._length) // 8)
+        return self._data[first:last], self._offset % 8
+
+    def to_bits(self):
+        """Unpacked (L,) uint8 array of 0/1 values (a new array)."""
+        window, shift = self._window()
+        return np.unpackbits(window)[shift:shift + self._length]
+
+    def __array__(self, dtype=None, copy=None):
+        if copy is False:
+            raise ValueError("BitBuffer cannot be converted to an array without a copy")
+        bits = self.to_bits()
+        return bits if dtype is None else bits.astype(dtype, copy=False)
+
+    def packed(self):
+        """The bits as a packed uint8 array starting at bit 0, padding bits
+        zero. A view of the shared array when the buffer is byte aligned and
+        a whole number of bytes long, otherwise a fresh array."""
+        window, shift = self._window()
+        if shift == 0 and self._length % 8 == 0:
+            return window
+        return np.packbits(self.to_bits())
+
+    def tobytes(self):
+        return self.packed().tobytes()
+
+    def __bytes__(self):
+        return self.tobytes()
+
+    def to_str(self):
+        """The legacy '0'/'1' string form."""
+        return (self.to_bits() + ord('0')).tobytes().decode()
+
+    def __str__(self):
+        return self.to_str()
+
+    def __repr__(self):
+        preview = self[:64].to_str()
+        return f"BitBuffer('{preview}{'...' if self._length > 64 else ''}', length={self._length})"
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return BitBuffer.from_bits(self.to_bits()[index])
+            return BitBuffer(self._data, max(0, stop - start), self._offset + start)
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("BitBuffer index out of range")
+        bit = self._offset + index
+        return int(self._data[bit // 8] >> (7 - bit % 8) & 1)
+
+    def __iter__(self):
+        return iter(self.to_bits().tolist())
+
+    def __eq__(self, other):
+        if isinstance(other, str):
+            other = BitBuffer.from_str(other)
+        if not isinstance(other, BitBuffer):
+            return NotImplemented
+        return len(self) == len(other) and np.array_equal(self.packed(), other.packed())
+
+    __hash__ = None
+
+    def copy(self):
+        """A buffer owning its own byte-aligned copy of the bits."""
+        return BitBuffer(self.packed().copy(), self._length)
+
+    def popcount(self):
+        """Number of set bits."""
+        return int(POPCOUNT[self.packed()].sum(dtype=np.int64))
+
+    def __xor__(self, other):
+        if len(self) != len(other):
+            raise ValueError(f"Cannot XOR buffers of {len(self)} and {len(other)} bits")
+        return BitBuffer(self.packed() ^ other.packed(), self._length)
+
+    def distance(self, other):
+        """Hamming distance to an equally long buffer."""
+        if len(self) != len(other):
+            raise ValueError(f"Cannot compare buffers of {len(self)} and {len(other)} bits")
+        return int(POPCOUNT[self.packed() ^ other.packed()].sum(dtype=np.int64))
+
+    def flip(self, index):
+        """A copy with bit `index` inverted."""
+        flipped = self.copy()
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("BitBuffer index out of range")
+        flipped._data[index // 8] ^= 0x80 >> index % 8
+        return flipped
+
+    @staticmethod
+    def concatenate(buffers):
+        buffers = list(buffers)
+        if not buffers:
+            return BitBuffer()
+        if all(len(b) % 8 == 0 for b in buffers):
+            return BitBuffer(np.concatenate([b.packed() for b in buffers]))
+        return BitBuffer.from_bits(np.concatenate([b.to_bits() for b in buffers]))
+
+
+def as_bits(data):
+    """Unpacked uint8 bits of a BitBuffer, '0'/'1' string or bit array."""
+    if isinstance(data, BitBuffer):
+        return data.to_bits()
+    if isinstance(data, str):
+        return np.frombuffer(data.encode(), dtype=np.uint8) - ord('0')
+    return np.asarray(data, dtype=np.uint8)
+
+
+def like(bits, original):
+    """Return unpacked `bits` in the form `original` was passed in: a
+    BitBuffer for a BitBuffer, a string for a string, else the array."""
+    if isinstance(original, BitBuffer):
+        return BitBuffer.from_bits(bits)
+    if isinstance(original, str):
+        return (np.asarray(bits, dtype=np.uint8) + ord('0')).tobytes().decode()
+    return bits
@@ -1,41 +1,166 @@
 import matplotlib.pyplot as plt
+import numpy as np
 from matplotlib.animation import FuncAnimation
-from ecc.stats_tracker import get_success_rates  # <-- New import
+from matplotlib.colors import to_rgba_array
+from ecc.stats_tracker import get_counts
 
 # ===============================
 # 🟩 1. Bit-by-Bit Visualization
 # ===============================
-def visualize_bits(title, labels, sequences, highlights=None):
-    fig, ax = plt.subplots(figsize=(12, len(sequences)))
-
-    for i, seq in enumerate(sequences):
-        for j, bit in enumerate(seq):
-            color = 'red' if highlights and highlights[i][j] else 'green'
-            ax.text(j, -i, bit, ha='center', va='center', fontsize=12,
-                    bbox=dict(facecolor=color, alpha=0.6))
-    
-    ax.set_xlim(-1, max(len(seq) for seq in sequences))
-    ax.set_ylim(-len(sequences)+0.5, 1)
-    ax.axis('off')
+# Cell codes. When several bits share one image column an error anywhere in
+# the block keeps it red, and a block holding both values is drawn as MIXED.
+PADDING, ZERO, ONE, MIXED, FLAGGED_ZERO, FLAGGED_ONE = range(6)
+BIT_COLORS = to_rgba_array(['white', '#cdebd3', '#2e8b57', '#7fbf8f', '#ec7063', '#b03a2e'])
+MAX_COLUMNS = 2000  # image columns when the axes width is unknown
+TEXT_LIMIT = 64     # label individual bits up to this many visible columns
+
+
+def _bit_matrix(sequences):
+    # bit strings or 0/1 arrays -> (rows, longest) uint8, shorter rows padded
+    rows = [np.frombuffer(s.encode(), dtype=np.uint8) - ord('0') if isinstance(s, str)
+            else np.asarray(s, dtype=np.uint8).reshape(-1) for s in sequences]
+    bits = np.zeros((len(rows), max(len(r) for r in rows)), dtype=np.uint8)
+    valid = np.zeros(bits.shape, dtype=bool)
+    for i, row in enumerate(rows):
+        bits[i, :len(row)] = row
+        valid[i, :len(row)] = True
+    return bits, valid
+
+
+def diff_highlights(bits, valid, reference=0):
+    """Positions where each row differs from the reference row (XOR)."""
+    return (bits ^ bits[reference]).astype(bool) & valid & valid[reference]
+
+
+def _downsample(cells, start, stop, max_columns=MAX_COLUMNS):
+    # one image column per `step` bits
+    step = max(1, -(-(stop - start) // max_columns))
+    block = cells[:, start:stop]
+    width = -(-block.shape[1] // step) * step
+    block = np.pad(block, ((0, 0), (0, width - block.shape[1])), mode='edge')
+    block = block.reshape(len(cells), -1, step)
+    high, low = block.max(axis=2), block.min(axis=2)
+    return np.where((high >= FLAGGED_ZERO) | (high == low), high, MIXED), step
+
+
+def visualize_bits(title, labels, sequences, highlights=None, reference=0):
+    """Draw the sequences as one raster, a row per sequence.
+
+    Without explicit highlights, bits differing from the `reference` row
+    (the encoded word, for the Encoded/Noisy/Decoded rows the GUI passes)
+    are marked red. Long frames are downsampled to the visible range and
+    redrawn at full detail when zoomed in.
+    """
+    bits, valid = _bit_matrix(sequences)
+    if highlights is not None and any(map(any, highlights)):
+        flags = _bit_matrix(highlights)[0].astype(bool)
+    else:
+        flags = diff_highlights(bits, valid, reference)
+    cells = np.where(valid, ZERO + bits + 3 * flags, PADDING).astype(np.uint8)
+    n_rows, width = cells.shape
+
+    fig, ax = plt.subplots(figsize=(12, 1 + 0.8 * n_rows))
+    image = ax.imshow(BIT_COLORS[cells[:, :1]], aspect='auto', interpolation='none')
+    texts = []
+
+    def render(start, stop):
+        # no more columns than the axes has pixels, so single errors stay visible
+        columns = int(ax.get_window_extent().width) or MAX_COLUMNS
+        shown, step = _downsample(cells, start, stop, columns)
+        image.set_data(BIT_COLORS[shown])
+        image.set_extent((start - 0.5, start + shown.shape[1] * step - 0.5, n_rows - 0.5, -0.5))
+        for text in texts:
+            text.remove()
+        texts.clear()
+        if step == 1 and stop - start <= TEXT_LIMIT:
+            for i, j in zip(*np.nonzero(valid[:, start:stop])):
+                texts.append(ax.text(start + j, i, str(bits[i, start + j]), ha='center',
+                                     va='center', fontsize=10, clip_on=True))
+
+    def on_xlim(axes):
+        low, high = axes.get_xlim()
+        start = int(np.clip(np.floor(low + 0.5), 0, width - 1))
+        stop = int(np.clip(np.ceil(high + 0.5), start + 1, width))
+        render(start, stop)
+        fig.canvas.draw_idle()
+
+    render(0, width)
+    ax.set_autoscale_on(False)
+    ax.set_xlim(-0.5, width - 0.5)
+    ax.set_ylim(n_rows - 0.5, -0.5)
+    ax.callbacks.connect('xlim_changed', on_xlim)
+
+    counts = flags.sum(axis=1)
+    ax.set_yticks(range(n_rows))
+    ax.set_yticklabels([f"{label} ({count} diff)" if i != reference else label
+                        for i, (label, count) in enumerate(zip(labels, counts))])
+    ax.set_xlabel("Bit position")
     ax.set_title(title)
     plt.tight_layout()
     plt.show()
+    return fig
 
 
 # ========================================
 # 📊 2. Live Accuracy Dashboard (NEW)
 # ========================================
-def show_live_accuracy_dashboard():
+class RingBuffer:
+    """Fixed number of rows; the oldest is overwritten once full."""
+
+    def __init__(self, capacity, width):
+        self.data = np.full((capacity, width), np.nan)
+        self.count = 0
+
+    def append(self, row):
+        self.data[self.count % len(self.data)] = row
+        self.count += 1
+
+    def ordered(self):
+        # oldest first, unfilled rows (NaN) leading
+        return np.roll(self.data, -(self.count % len(self.data)), axis=0)
+
+
+def show_live_accuracy_dashboard(interval=1000, history=600):
+    """Bars with the current success rate per codec beside the last
+    `history` samples of each rate. Artists are created once and updated
+    in place with blitting, so each frame costs the same however long the
+    dashboard stays open."""
+    codecs = list(get_counts())
+    samples = RingBuffer(history, len(codecs))
+    seconds_ago = (np.arange(history) - (history - 1)) * interval / 1000
+
+    fig, (bar_ax, line_ax) = plt.subplots(1, 2, figsize=(12, 5))
+    bars = bar_ax.bar(codecs, [0] * len(codecs), color='skyblue')
+    labels = [bar_ax.text(bar.get_x() + bar.get_width() / 2, 1, "", ha='center', va='bottom')
+              for bar in bars]
+    bar_ax.set_ylim(0, 105)
+    bar_ax.set_ylabel("Success Rate (%)")
+    bar_ax.set_title("ECC Live Accuracy Dashboard")
+
+    lines = [line_ax.plot(seconds_ago, samples.ordered()[:, i], label=codec)[0]
+             for i, codec in enumerate(codecs)]
+    line_ax.set_xlim(seconds_ago[0], 0)
+    line_ax.set_ylim(0, 105)
+    line_ax.set_xlabel("Seconds ago")
+    line_ax.set_title("Success Rate Over Time")
+    line_ax.legend(loc='lower left')
+    plt.tight_layout()
+
+    artists = list(bars) + labels + lines
+
     def animate(i):
-        plt.cla()
-        data = get_success_rates()
-        ecc_types = list(data.keys())
-        values = list(data.values())
-        plt.bar(ecc_types, values, color='skyblue')
-        plt.ylim(0, 100)
-        plt.ylabel("Success Rate (%)")
-        plt.title("ECC Live Accuracy Dashboard")
-        plt.tight_layout()
-
-    ani = FuncAnimation(plt.gcf(), animate, interval=1000)
+        counts = get_counts()
+        rates = [counts[c][1] / counts[c][0] * 100 if counts[c][0] else 0 for c in codecs]
+        samples.append(rates)
+        for bar, label, rate, (tested, _) in zip(bars, labels, rates, (counts[c] for c in codecs)):
+            bar.set_height(rate)
+            label.set_y(rate + 1)
+            label.set_text(f"{rate:.1f}% of {tested}")
+        history_rows = samples.ordered()
+        for column, line in enumerate(lines):
+            line.set_ydata(history_rows[:, column])
+        return artists
+
+    ani = FuncAnimation(fig, animate, interval=interval, blit=True, cache_frame_data=False)
     plt.show()
+    return ani
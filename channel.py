@@ -0,0 +1,126 @@
+# ecc/channel.py
+# Channel models over NumPy bit arrays. Every function takes a single frame
+# (L,) or a batch (N, L) of 0/1 values and an `rng`, which may be a
+# numpy.random.Generator or a seed; the same seed gives the same errors.
+import numpy as np
+
+
+def _frames(bits):
+    bits = np.asarray(bits, dtype=np.uint8)
+    return bits, np.atleast_2d(bits)
+
+
+def _like(bits, frames):
+    return frames[0] if bits.ndim == 1 else frames
+
+
+def binary_symmetric(bits, p, rng=None):
+    """Flip every bit independently with probability p."""
+    rng = np.random.default_rng(rng)
+    bits = np.asarray(bits, dtype=np.uint8)
+    return bits ^ (rng.random(bits.shape) < p)
+
+
+def fixed_flips(bits, count, rng=None):
+    """Flip exactly `count` distinct random bits in every frame."""
+    rng = np.random.default_rng(rng)
+    bits, frames = _frames(bits)
+    n_frames, length = frames.shape
+    if count > length:
+        raise ValueError(f"Cannot flip {count} bits in a frame of {length}")
+    positions = rng.random((n_frames, length)).argsort(axis=1)[:, :count]
+    noisy = frames.copy()
+    noisy[np.arange(n_frames)[:, None], positions] ^= 1
+    return _like(bits, noisy)
+
+
+def burst_errors(bits, length, rng=None):
+    """Flip one run of `length` consecutive bits at a random offset per frame.
+
+    Frames shorter than the burst get a single random flip instead.
+    """
+    rng = np.random.default_rng(rng)
+    bits, frames = _frames(bits)
+    n_frames, frame_len = frames.shape
+    if frame_len < length:
+        return fixed_flips(bits, 1, rng)
+    start = rng.integers(0, frame_len - length + 1, size=(n_frames, 1))
+    offset = np.arange(frame_len) - start
+    return _like(bits, frames ^ ((offset >= 0) & (offset < length)))
+
+
+def gilbert_elliott(bits, p_good_bad, p_bad_good=0.1, error_good=0.0, error_bad=0.5, rng=None):
+    """Two-state Markov burst channel.
+
+    Each frame starts in the stationary state distribution, moves from the
+    good to the bad state with probability p_good_bad per bit and back with
+    p_bad_good, and flips bits with error_good / error_bad in each state.
+    """
+    rng = np.random.default_rng(rng)
+    bits, frames = _frames(bits)
+    n_frames, length = frames.shape
+
+    # Sojourn times in each state are geometric, so the state sequence can be
+    # built from alternating run lengths rather than stepping bit by bit.
+    stationary_bad = p_good_bad / (p_good_bad + p_bad_good) if p_good_bad + p_bad_good else 0.0
+    bad = rng.random((n_frames, 1)) < stationary_bad
+    toggles = np.zeros((n_frames, length + 1), dtype=np.int32)
+    covered = np.zeros(n_frames, dtype=np.int64)
+    in_bad = bad[:, 0].copy()
+    rows = np.arange(n_frames)
+    while (covered < length).any():
+        leave = np.where(in_bad, p_bad_good, p_good_bad)
+        runs = rng.geometric(np.where(leave > 0, leave, 1.0))
+        runs[leave == 0] = length
+        covered = np.minimum(covered + runs, length)
+        np.add.at(toggles, (rows, covered), 1)
+        in_bad = ~in_bad
+    state_bad = (np.cumsum(toggles[:, :length], axis=1) + bad) % 2 == 1
+
+    error_rate = np.where(state_bad, error_bad, error_good)
+    return _like(bits, frames ^ (rng.random((n_frames, length)) < error_rate))
+
+
+def noise_sigma(ebn0_db, rate=1.0):
+    """Noise standard deviation for unit-energy BPSK symbols at Eb/N0."""
+    return np.sqrt(1.0 / (2.0 * rate * 10.0 ** (ebn0_db / 10.0)))
+
+
+def bpsk_awgn(bits, ebn0_db, rate=1.0, rng=None, soft=False):
+    """BPSK over an AWGN channel at the given Eb/N0 (dB) and code rate.
+
+    Bit 0 maps to +1 and bit 1 to -1. Returns hard decisions by default, or
+    with soft=True the channel LLRs (positive favours 0) for soft decoders.
+    """
+    rng = np.random.default_rng(rng)
+    bits = np.asarray(bits, dtype=np.uint8)
+    sigma = noise_sigma(ebn0_db, rate)
+    received = 1.0 - 2.0 * bits + sigma * rng.standard_normal(bits.shape)
+    if soft:
+        return 2.0 * received / sigma ** 2
+    return (received < 0).astype(np.uint8)
+
+
+CHANNELS = ('bsc', 'flips', 'burst', 'gilbert-elliott', 'awgn')
+
+
+def apply_channel(name, bits, level, rng=None, rate=1.0, soft=False, **params):
+    """Run `bits` through a channel model by name at noise level `level`.
+
+    `level` is the swept parameter of each model: the crossover probability
+    for 'bsc', the flip count for 'flips', the burst length for 'burst',
+    p_good_bad for 'gilbert-elliott' (other parameters via **params) and
+    Eb/N0 in dB for 'awgn'. Only 'awgn' returns LLRs when soft=True.
+    """
+    rng = np.random.default_rng(rng)
+    if name == 'bsc':
+        return binary_symmetric(bits, level, rng)
+    elif name == 'flips':
+        return fixed_flips(bits, int(level), rng)
+    elif name == 'burst':
+        return burst_errors(bits, int(level), rng)
+    elif name == 'gilbert-elliott':
+        return gilbert_elliott(bits, level, rng=rng, **params)
+    elif name == 'awgn':
+        return bpsk_awgn(bits, level, rate, rng, soft)
+    raise ValueError(f"Unknown channel model: {name!r}")
@@ -0,0 +1,227 @@
+# ecc/cli.py
+# Headless command line, run as `python -m ecc`:
+#
+#   python -m ecc encode in.bin out.ecc --codec rs --nsym 16
+#   python -m ecc decode out.ecc in.bin --report -
+#   python -m ecc simulate --codec hamming --codec convolutional:puncture=3/4 \
+#       --channel awgn --levels 0 2 4 6 --soft --format csv
+#   python -m ecc simulate --codec hamming --levels 0.01 0.02 --store results.sqlite
+#   python -m ecc recommend --error-rate 1e-3 --mean-burst 4 --max-ber 1e-6 --max-overhead 1
+#   python -m ecc bench --cases 'conv_*' --baseline baseline.json
+#   python -m ecc --profile simulate --codec convolutional --levels 0.02
+#
+# Only argparse and the standard library are imported up front; numpy and
+# the codec modules load inside the subcommand that needs them, and nothing
+# here touches PyQt5 or matplotlib.
+import argparse
+import csv
+import json
+import os
+import sys
+
+from ecc import profiling, protect
+
+RESULT_FIELDS = [
+    'codec', 'codec_params', 'channel', 'channel_params', 'level', 'soft',
+    'frames', 'bits', 'frame_errors', 'bit_errors', 'fer', 'ber',
+    'fer_low', 'fer_high', 'ber_low', 'ber_high', 'seconds',
+]
+
+
+def parse_spec(spec):
+    """'name:key=value,key=value' -> (name, params); values are parsed as
+    JSON where possible ('3' -> 3, 'null' -> None) and kept as strings
+    otherwise ('3/4')."""
+    name, _, rest = spec.partition(':')
+    params = {}
+    for item in filter(None, rest.split(',')):
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected key=value, got {item!r}")
+        try:
+            params[key] = json.loads(value)
+        except ValueError:
+            params[key] = value
+    return name, params
+
+
+def _flatten(result):
+    row = dict(result)
+    row['fer_low'], row['fer_high'] = row.pop('fer_ci')
+    row['ber_low'], row['ber_high'] = row.pop('ber_ci')
+    row['codec_params'] = json.dumps(row['codec_params'], sort_keys=True)
+    row['channel_params'] = json.dumps(row['channel_params'], sort_keys=True)
+    return row
+
+
+def write_results(results, fmt, path, fields=None):
+    """Write a list of result dicts as JSON or CSV to `path` ('-': stdout)."""
+    out = sys.stdout if path == '-' else open(path, 'w', newline='')
+    try:
+        if fmt == 'json':
+            json.dump(results, out, indent=2)
+            out.write('\n')
+        else:
+            writer = csv.DictWriter(out, fieldnames=fields or (list(results[0]) if results else []))
+            writer.writeheader()
+            writer.writerows(results)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def run_simulate(args):
+    from ecc.simulation import grid, sweep
+
+    points = grid(args.codec or ['hamming'], args.channel or ['bsc'], args.levels, args.soft)
+    stop = {
+        'max_frame_errors': args.max_frame_errors,
+        'max_frames': args.max_frames,
+        'time_budget': args.time_budget,
+        'batch_frames': args.batch_frames,
+    }
+    # stages are only counted in this process, so profile runs stay inline
+    workers = 1 if profiling.is_enabled() else args.workers
+    if args.store and not args.analytics:
+        from ecc.result_store import ResultStore
+        with ResultStore(args.store) as store:
+            results = sweep(points, seed=args.seed, workers=workers, store=store, **stop)
+    else:
+        results = sweep(points, seed=args.seed, workers=workers, analytics=bool(args.analytics), **stop)
+    if args.analytics:
+        # histograms go to their own file, the results keep their usual fields
+        histograms = [r.pop('analytics') for r in results]
+        write_results([dict(r, analytics=h) for r, h in zip(results, histograms)],
+                      'json', args.analytics)
+    if args.format == 'csv':
+        write_results([_flatten(r) for r in results], 'csv', args.output, RESULT_FIELDS)
+    else:
+        write_results(results, 'json', args.output)
+    return 0
+
+
+def run_recommend(args):
+    from ecc.recommender import Channel, Constraints, Recommender, burst_channel, format_table
+
+    if args.error_rate is not None:
+        channel = burst_channel(args.error_rate, args.mean_burst)
+    else:
+        channel = Channel(args.channel[0], args.level, args.channel[1])
+    constraints = Constraints(args.max_ber, args.max_fer, args.max_overhead, args.max_latency,
+                              args.min_throughput, args.link_rate)
+
+    def recommend(store):
+        recommender = Recommender(store, frame_bits=args.frame_bits, seed=args.seed)
+        return recommender.evaluate(channel, constraints, args.time_budget)
+
+    if args.store:
+        from ecc.result_store import ResultStore
+        with ResultStore(args.store) as store:
+            evaluations = recommend(store)
+    else:
+        evaluations = recommend(None)
+    best = evaluations[0] if evaluations and evaluations[0].status in ('verified', 'likely') else None
+    if args.format == 'json':
+        write_results([e._asdict() for e in evaluations], 'json', args.output)
+    else:
+        out = sys.stdout if args.output == '-' else open(args.output, 'w')
+        try:
+            out.write(f"{channel}\n{format_table(evaluations)}\n\n")
+            out.write(f"Recommended: {best.codec} {json.dumps(best.codec_params, sort_keys=True)} ({best.status})\n"
+                      if best else "No configuration meets the constraints.\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    return 0 if best else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m ecc',
+                                     description='Error-correcting code tools without the GUI.')
+    parser.add_argument('--profile', action='store_true',
+                        help='print a per-stage time breakdown to stderr (same as ECC_PROFILE=1)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    protect.add_arguments(subparsers)
+
+    sim = subparsers.add_parser('simulate', help='Monte Carlo BER/FER sweep')
+    sim.add_argument('--codec', type=parse_spec, action='append',
+                     help="hamming, convolutional or reed-solomon, optionally with params "
+                          "as name:key=value,... (repeatable)")
+    sim.add_argument('--channel', type=parse_spec, action='append',
+                     help='bsc, flips, burst, gilbert-elliott or awgn, same syntax (repeatable)')
+    sim.add_argument('--levels', type=float, nargs='+', default=[0.01],
+                     help='noise levels (crossover probability, flips, burst length or Eb/N0 dB)')
+    sim.add_argument('--soft', action='store_true', help='soft-decision decoding on awgn')
+    sim.add_argument('--seed', type=int, default=0)
+    sim.add_argument('--workers', type=int, default=None, help='processes (1 runs inline)')
+    sim.add_argument('--max-frame-errors', type=int, default=100)
+    sim.add_argument('--max-frames', type=int, default=100_000)
+    sim.add_argument('--time-budget', type=float, default=None, help='seconds per point')
+    sim.add_argument('--batch-frames', type=int, default=64)
+    sim.add_argument('--store', default=os.environ.get('ECC_RESULT_STORE'),
+                     help='SQLite result cache: reuse and extend points simulated before '
+                          '(default: $ECC_RESULT_STORE, unset for none)')
+    sim.add_argument('--analytics', metavar='PATH',
+                     help='also write per-point error histograms (positions, bursts, weights) '
+                          'as JSON; bypasses --store')
+
+    sim.add_argument('--format', choices=['json', 'csv'], default='json')
+    sim.add_argument('--output', default='-', help="result file ('-' for stdout)")
+
+    rec = subparsers.add_parser('recommend', help='codec configuration for a channel, from measured '
+                                                  'BER/FER and speed')
+    rec.add_argument('--channel', type=parse_spec, default=('bsc', {}),
+                     help='channel model with params, as for simulate (default bsc)')
+    rec.add_argument('--level', type=float, default=0.01, help='noise level of --channel')
+    rec.add_argument('--error-rate', type=float, default=None,
+                     help='average bit error rate; with --mean-burst, replaces --channel/--level by '
+                          'a bsc or gilbert-elliott channel with those statistics')
+    rec.add_argument('--mean-burst', type=float, default=1.0, help='average error burst length in bits')
+    rec.add_argument('--max-ber', type=float, default=1e-5, help='required bit error rate')
+    rec.add_argument('--max-fer', type=float, default=None, help='required frame error rate')
+    rec.add_argument('--max-overhead', type=float, default=None, help='parity bits per data bit')
+    rec.add_argument('--max-latency', type=float, default=None,
+                     help='seconds to encode and decode one frame')
+    rec.add_argument('--min-throughput', type=float, default=None,
+                     help='encode + decode speed in data bits/s')
+    rec.add_argument('--link-rate', type=float, default=None,
+                     help='channel bits/s: rank by data bits/s delivered instead of per channel bit')
+    rec.add_argument('--frame-bits', type=int, default=1024)
+    rec.add_argument('--time-budget', type=float, default=5.0, help='seconds of simulation')
+    rec.add_argument('--seed', type=int, default=0)
+    rec.add_argument('--store', default=os.environ.get('ECC_RESULT_STORE'),
+                     help='SQLite result cache holding the BER/FER and speed tables '
+                          '(default: $ECC_RESULT_STORE, unset for none)')
+    rec.add_argument('--format', choices=['table', 'json'], default='table')
+    rec.add_argument('--output', default='-', help="result file ('-' for stdout)")
+
+    # options are parsed by ecc.benchmark itself, which is only imported
+    # when the subcommand runs
+    subparsers.add_parser('bench', add_help=False,
+                          help='codec and noise throughput (see python -m ecc bench --help)')
+    return parser
+
+
+def run(parser, args, rest):
+    if args.command == 'bench':
+        from ecc import benchmark
+        return benchmark.main(rest, prog='python -m ecc bench')
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+    if args.command == 'simulate':
+        return run_simulate(args)
+    if args.command == 'recommend':
+        return run_recommend(args)
+    return protect.run(args)
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, rest = parser.parse_known_args(argv)
+    if args.profile:
+        profiling.enable()
+    try:
+        return run(parser, args, rest)
+    finally:
+        if profiling.is_enabled():
+            sys.stderr.write(profiling.format_report() + '\n')
@@ -0,0 +1,295 @@
+# ecc/container.py
+# Framed container for protecting byte streams. Layout:
+#
+#   file header   MAGIC, version (u8), params length (u16), params JSON,
+#                 CRC32 of everything before it
+#   frame * N     SYNC, seq (u32), payload length (u32), encoded length (u32),
+#                 payload CRC32 (u32), header CRC32 (u32), encoded bytes
+#   trailer       END, frame count (u32), payload length (u64), CRC32 (u32)
+#
+# Frames are independent, so both directions stream in constant memory. A
+# frame whose header is damaged is skipped by scanning for the next SYNC;
+# the trailer tells how many frames there were, so damaged headers at the
+# end are reported too. Version 1 files have no trailer.
+import json
+import struct
+import zlib
+from collections import namedtuple
+
+import numpy as np
+
+from ecc.convolutional import ConvolutionalCode
+from ecc.hamming import CORRECTED, hamming_code
+from ecc.reed_solomon import rs_correct_chunked, rs_encode_chunked
+
+MAGIC = b'ECCF'
+VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+SYNC = b'\x1a\xcf\xfc\x1d'
+END = b'\x1a\xcf\xfc\x1e'
+FRAME_HEADER = struct.Struct('>IIII')
+TRAILER = struct.Struct('>IQ')
+CRC = struct.Struct('>I')
+SCAN_CHUNK = 1 << 16  # bytes read at a time while looking for SYNC
+
+FrameReport = namedtuple('FrameReport', ['seq', 'status', 'corrected'])
+# status is 'ok', 'corrected', 'uncorrectable', 'lost' (header destroyed,
+# payload zero-filled) or 'truncated' (the stream ended before its trailer,
+# so an unknown number of frames from seq on are missing; empty payload);
+# corrected counts repaired symbols (bytes for RS, bits otherwise)
+
+
+class ContainerError(Exception):
+    pass
+
+
+class RSByteCodec:
+    name = 'rs'
+
+    def __init__(self, nsym=10, chunk_size=None):
+        self.nsym = nsym
+        self.chunk_size = chunk_size
+
+    def params(self):
+        return {'nsym': self.nsym, 'chunk_size': self.chunk_size}
+
+    def encode(self, payload):
+        return rs_encode_chunked(payload, self.nsym, self.chunk_size)
+
+    def decode(self, encoded, length):
+        payload, _, corrected = rs_correct_chunked(encoded, self.nsym, self.chunk_size)
+        return payload, corrected
+
+
+class ConvolutionalByteCodec:
+    name = 'conv'
+
+    def __init__(self, generators=(0o7, 0o5), constraint_length=3, puncture=None, block_bits=8192):
+        self.code = ConvolutionalCode(generators, constraint_length, puncture)
+        self.puncture = puncture
+        self.block_bits = block_bits
+
+    def params(self):
+        return {
+            'generators': list(self.code.generators),
+            'constraint_length': self.code.constraint_length,
+            'puncture': self.puncture,
+            'block_bits': self.block_bits,
+        }
+
+    # A frame is coded as independent blocks of block_bits, each terminated
+    # with K - 1 zero tail bits, so all blocks decode as one Viterbi batch.
+    def _blocks(self, n_bits):
+        return max(1, -(-n_bits // self.block_bits))
+
+    def encode(self, payload):
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+        blocks = np.zeros(self._blocks(len(bits)) * self.block_bits, dtype=np.uint8)
+        blocks[:len(bits)] = bits
+        blocks = np.pad(blocks.reshape(-1, self.block_bits), ((0, 0), (0, self.code.memory)))
+        return np.packbits(self.code.encode(blocks)).tobytes()
+
+    def decode(self, encoded, length):
+        n_blocks = self._blocks(length * 8)
+        block_len = self.code.encoded_length(self.block_bits + self.code.memory)
+        received = np.zeros(n_blocks * block_len, dtype=np.uint8)
+        available = np.unpackbits(np.frombuffer(encoded, dtype=np.uint8))[:len(received)]
+        received[:len(available)] = available
+        received = received.reshape(n_blocks, block_len)
+        decoded = self.code.decode(received)
+        corrected = int(np.count_nonzero(self.code.encode(decoded) != received))
+        bits = decoded[:, :self.block_bits].reshape(-1)[:length * 8]
+        return np.packbits(bits).tobytes(), corrected
+
+
+class HammingByteCodec:
+    name = 'hamming'
+
+    def __init__(self, m=3, extended=False, data_bits=None):
+        self.code = hamming_code(m, extended, data_bits)
+
+    def params(self):
+        return {'m': self.code.m, 'extended': self.code.extended, 'data_bits': self.code.k}
+
+    def encode(self, payload):
+        return self.code.encode_bytes(payload)
+
+    def decode(self, encoded, length):
+        # blocks with a detected double error are left to the frame CRC
+        data, status = self.code.decode_bytes(encoded, length)
+        return data, int(np.count_nonzero(status == CORRECTED))
+
+
+BYTE_CODECS = {
+    RSByteCodec.name: RSByteCodec,
+    ConvolutionalByteCodec.name: ConvolutionalByteCodec,
+    HammingByteCodec.name: HammingByteCodec,
+}
+
+
+def make_byte_codec(name, **params):
+    if name not in BYTE_CODECS:
+        raise ValueError(f"Unknown codec: {name!r}")
+    return BYTE_CODECS[name](**params)
+
+
+def file_header(codec, block_size):
+    params = json.dumps({'codec': codec.name, 'block_size': block_size, **codec.params()}).encode()
+    head = MAGIC + struct.pack('>BH', VERSION, len(params)) + params
+    return head + CRC.pack(zlib.crc32(head))
+
+
+def read_file_header(stream):
+    """Parse the file header; returns (codec, block_size, version)."""
+    head = stream.read(len(MAGIC) + 3)
+    if len(head) < len(MAGIC) + 3 or head[:len(MAGIC)] != MAGIC:
+        raise ContainerError("Not an ECC container")
+    version, params_len = struct.unpack('>BH', head[len(MAGIC):])
+    if version not in SUPPORTED_VERSIONS:
+        raise ContainerError(f"Unsupported container version {version}")
+    params = stream.read(params_len)
+    (crc,) = CRC.unpack(stream.read(CRC.size))
+    if zlib.crc32(head + params) != crc:
+        raise ContainerError("Container header is corrupt")
+    params = json.loads(params)
+    name = params.pop('codec')
+    block_size = params.pop('block_size')
+    if 'generators' in params:
+        params['generators'] = tuple(params['generators'])
+    return make_byte_codec(name, **params), block_size, version
+
+
+def encode_stream(chunks, codec, block_size):
+    """Yield the container bytes for an iterable of payload chunks.
+
+    Chunks are cut or joined into frames of exactly block_size bytes (the
+    last may be shorter), whatever sizes the source delivers.
+    """
+    yield file_header(codec, block_size)
+    seq = total = 0
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        while len(pending) >= block_size:
+            yield _frame(seq, bytes(pending[:block_size]), codec)
+            del pending[:block_size]
+            seq += 1
+            total += block_size
+    if pending:
+        yield _frame(seq, bytes(pending), codec)
+        seq += 1
+        total += len(pending)
+    trailer = TRAILER.pack(seq, total)
+    yield END + trailer + CRC.pack(zlib.crc32(trailer))
+
+
+def _frame(seq, payload, codec):
+    encoded = codec.encode(payload)
+    header = FRAME_HEADER.pack(seq, len(payload), len(encoded), zlib.crc32(payload))
+    return SYNC + header + CRC.pack(zlib.crc32(header)) + encoded
+
+
+class _Reader:
+    # Buffered reads over a stream with only read(n), searching for the
+    # frame and trailer markers a chunk at a time.
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = b''
+        self.pos = 0
+
+    def _fill(self, n):
+        # at least n bytes buffered from pos, unless the stream ends first
+        if len(self.buffer) - self.pos >= n:
+            return
+        parts = [self.buffer[self.pos:]]
+        have = len(parts[0])
+        while have < n:
+            data = self.stream.read(max(SCAN_CHUNK, n - have))
+            if not data:
+                break
+            parts.append(data)
+            have += len(data)
+        self.buffer = b''.join(parts)
+        self.pos = 0
+
+    def read(self, n):
+        self._fill(n)
+        data = self.buffer[self.pos:self.pos + n]
+        self.pos += len(data)
+        return data
+
+    def _find_marker(self):
+        # move pos to the next SYNC or END, or return False at end of stream
+        while True:
+            hits = [i for i in (self.buffer.find(SYNC, self.pos), self.buffer.find(END, self.pos))
+                    if i >= 0]
+            if hits:
+                self.pos = min(hits)
+                return True
+            # a marker may straddle the end of the buffer
+            self.pos = max(self.pos, len(self.buffer) - len(SYNC) + 1)
+            self._fill(len(self.buffer) - self.pos + SCAN_CHUNK)
+            if len(self.buffer) - self.pos < len(SYNC):
+                return False
+
+    def next_header(self):
+        """Consume up to and including the next frame header or trailer
+        with a valid CRC; returns ('frame', fields), ('end', fields) or None
+        at the end of the stream. A marker followed by a bad CRC is taken
+        for payload bytes, and the search resumes one byte after it."""
+        while self._find_marker():
+            marker = self.buffer[self.pos:self.pos + len(SYNC)]
+            kind, fields = ('frame', FRAME_HEADER) if marker == SYNC else ('end', TRAILER)
+            size = len(SYNC) + fields.size + CRC.size
+            self._fill(size)
+            record = self.buffer[self.pos + len(SYNC):self.pos + size]
+            if len(record) == fields.size + CRC.size:
+                (crc,) = CRC.unpack(record[fields.size:])
+                if zlib.crc32(record[:fields.size]) == crc:
+                    self.pos += size
+                    return kind, fields.unpack(record[:fields.size])
+            self.pos += 1
+        return None
+
+
+def decode_stream(stream):
+    """Yield (payload, FrameReport) for every frame of a container stream.
+
+    `stream` only needs read(n), so a file, mmap or stdin all work. Frames
+    whose payload CRC does not match after decoding are still yielded,
+    marked 'uncorrectable', and frames lost to a damaged header come back
+    zero-filled, so the output keeps its length. A stream cut before its
+    trailer ends with a 'truncated' report; version 1 files have no
+    trailer, so lost frames after their last good header go unnoticed.
+    """
+    codec, block_size, version = read_file_header(stream)
+    reader = _Reader(stream)
+    expected = 0
+    while True:
+        found = reader.next_header()
+        if found is None:
+            if version >= 2:
+                yield b'', FrameReport(expected, 'truncated', 0)
+            return
+        kind, fields = found
+        if kind == 'end':
+            frames, total = fields
+            for missing in range(expected, frames):
+                size = block_size if missing < frames - 1 else total - block_size * (frames - 1)
+                yield bytes(size), FrameReport(missing, 'lost', 0)
+            return
+        seq, length, encoded_len, payload_crc = fields
+        for missing in range(expected, seq):
+            yield bytes(block_size), FrameReport(missing, 'lost', 0)
+        expected = max(expected, seq + 1)
+        encoded = reader.read(encoded_len)
+        payload, corrected = codec.decode(encoded, length)
+        payload = payload[:length].ljust(length, b'\0')
+        if zlib.crc32(payload) != payload_crc:
+            status = 'uncorrectable'
+        elif corrected:
+            status = 'corrected'
+        else:
+            status = 'ok'
+        yield payload, FrameReport(seq, status, corrected)
@@ -1,54 +1,421 @@
+from collections import namedtuple
+from functools import lru_cache, partial
+
 import numpy as np
 
+from ecc.bitbuffer import as_bits, like
+from ecc.profiling import profiled
+
+ERASED = 2  # received-bit value that carries no information
+
+# Puncturing patterns for rate-1/2 mother codes, one row per generator and
+# one column per input bit of the period. Zeros are not transmitted.
+PUNCTURE_PATTERNS = {
+    '1/2': ((1,), (1,)),
+    '2/3': ((1, 1), (1, 0)),
+    '3/4': ((1, 0, 1), (1, 1, 0)),
+}
+
+_METRIC_CHUNK = 256  # steps of branch metrics gathered at a time
+# Long frames are decoded as overlapping windows (ConvolutionalCode._segments):
+# decoded steps kept per window (a 16th of the frame within these bounds),
+# and warm-up steps per constraint length on either side. 5 * K, as in the
+# streaming decoder, is enough for hard decisions but not for soft or
+# punctured decoding at low SNR, where the windows then occasionally
+# disagree with a whole-frame decode.
+_SEGMENT_STEPS = (64, 1024)
+_SEGMENT_WARMUP = 16
+
+Trellis = namedtuple('Trellis', [
+    'next_state',       # (state, input bit) -> next state
+    'outputs',          # (state, input bit) -> output bits
+    'branch_outputs',   # (input bit, j % half, oldest bit) -> output bits
+    'branch_metrics',   # (base-3 symbol, input bit, j % half, oldest bit)
+    'tie_order',        # final-state preference on equal metrics
+])
+
+
+def _parity(values):
+    values = np.asarray(values)
+    parity = np.zeros(values.shape, dtype=np.uint8)
+    while values.any():
+        parity ^= (values & 1).astype(np.uint8)
+        values = values >> 1
+    return parity
+
+
+@lru_cache(maxsize=None)
+def _trellis(generators, constraint_length):
+    # A state is the last K - 1 input bits read as an integer, most recent
+    # bit first, so input u moves state s to (u << (K - 2)) | (s >> 1) and
+    # generator g (octal, MSB = current input) taps the register
+    # (u << (K - 1)) | s. State j is entered on input bit j // half from the
+    # two states 2 * (j % half) + b, which differ only in their oldest bit b.
+    # Laid out as (input bit, j % half, b), the predecessors of every state
+    # are just the current metrics viewed as (half, 2) pairs, so
+    # add-compare-select needs no gathers.
+    memory = constraint_length - 1
+    n_states = 1 << memory
+    half = n_states // 2
+    states = np.arange(n_states)[:, None]
+    inputs = np.arange(2)[None, :]
+    registers = (inputs << memory) | states
+    next_state = registers >> 1
+    outputs = np.stack([_parity(registers & g) for g in generators], axis=-1)
+
+    a = np.arange(half)[None, :, None]
+    b = np.arange(2)[None, None, :]
+    u = np.arange(2)[:, None, None]
+    branch_outputs = outputs[2 * a + b, u]
+
+    n = len(generators)
+    symbols = np.arange(3 ** n)[:, None] // 3 ** np.arange(n - 1, -1, -1) % 3
+    symbols = symbols[:, None, None, None, :].astype(np.uint8)
+    branch_metrics = (
+        (symbols != branch_outputs) & (symbols != ERASED)
+    ).sum(axis=-1, dtype=np.uint8)
+
+    # Bit-reversed state order, which is what the original dict-based
+    # decoder ended up preferring on ties.
+    reversed_states = [int(format(s, f'0{memory}b')[::-1], 2) for s in range(n_states)]
+    tie_order = np.argsort(reversed_states)
+
+    tables = Trellis(next_state, outputs, branch_outputs, branch_metrics, tie_order)
+    for table in tables:
+        table.setflags(write=False)
+    return tables
+
+
+def _puncture_mask(puncture, n_outputs):
+    if puncture is None:
+        return None
+    if isinstance(puncture, str):
+        if n_outputs != 2:
+            raise ValueError(f"Named puncturing patterns need a rate-1/2 code, got 1/{n_outputs}")
+        puncture = PUNCTURE_PATTERNS[puncture]
+    pattern = np.asarray(puncture, dtype=bool)
+    if pattern.ndim != 2 or pattern.shape[0] != n_outputs or not pattern.any():
+        raise ValueError(f"Puncturing pattern must be {n_outputs} rows with at least one kept bit")
+    # transmission order: all generator outputs of one input bit, then the next
+    return pattern.T.reshape(-1)
+
+
+class ConvolutionalCode:
+    """Rate-1/n convolutional code, optionally punctured.
+
+    Generators are given in octal with the MSB tapping the current input,
+    e.g. ConvolutionalCode((0o171, 0o133), 7) for the standard K=7 code.
+    Trellis tables are shared by every instance with the same definition.
+    """
+
+    def __init__(self, generators=(0o7, 0o5), constraint_length=3, puncture=None):
+        generators = tuple(int(g) for g in generators)
+        if constraint_length < 2:
+            raise ValueError("Constraint length must be at least 2")
+        if not generators or any(g <= 0 or g >> constraint_length for g in generators):
+            raise ValueError(f"Generators must be nonzero and fit in {constraint_length} bits")
+        self.generators = generators
+        self.constraint_length = constraint_length
+        self.n_outputs = len(generators)
+        self.memory = constraint_length - 1
+        self.n_states = 1 << self.memory
+        self.trellis = _trellis(generators, constraint_length)
+        self.puncture = _puncture_mask(puncture, self.n_outputs)
+
+    @property
+    def rate(self):
+        if self.puncture is None:
+            return 1 / self.n_outputs
+        return len(self.puncture) / self.n_outputs / self.puncture.sum()
+
+    def __repr__(self):
+        gens = ', '.join(f'0o{g:o}' for g in self.generators)
+        return f"ConvolutionalCode(({gens}), {self.constraint_length})"
+
+    def encoded_length(self, n_bits):
+        """Number of transmitted bits for n_bits of input."""
+        length = n_bits * self.n_outputs
+        return length if self.puncture is None else len(self._kept(length))
+
+    def _kept(self, length):
+        periods = -(-length // len(self.puncture))
+        return np.flatnonzero(np.tile(self.puncture, periods)[:length])
+
+    @profiled(arg=1)
+    def encode(self, bits):
+        """Encode a bit array, or an (N, L) batch, from the all-zero state."""
+        bits = np.asarray(bits, dtype=np.uint8)
+        frames = np.atleast_2d(bits)
+        n_frames, length = frames.shape
+        # The state before step t is the previous K - 1 inputs, so every
+        # step can be looked up in the output table at once.
+        history = np.zeros((n_frames, length + self.memory), dtype=np.int64)
+        history[:, self.memory:] = frames
+        state = np.zeros((n_frames, length), dtype=np.int64)
+        for delay in range(1, self.constraint_length):
+            start = self.memory - delay
+            state |= history[:, start:start + length] << (self.memory - delay)
+        encoded = self.trellis.outputs[state, frames].reshape(n_frames, -1)
+        if self.puncture is not None:
+            encoded = encoded[:, self._kept(encoded.shape[1])]
+        return encoded[0] if bits.ndim == 1 else encoded
+
+    def depuncture(self, received, fill=ERASED):
+        """Re-insert `fill` at the punctured positions of an (N, L) batch."""
+        if self.puncture is None:
+            return received
+        n_frames, length = received.shape
+        if length == 0:
+            return received
+        per_period = int(self.puncture.sum())
+        kept = self._kept(-(-length // per_period) * len(self.puncture))[:length]
+        mother = np.full((n_frames, kept[-1] + 1), fill, dtype=received.dtype)
+        mother[:, kept] = received
+        return mother
+
+    def _symbols(self, frames):
+        # base-3 symbol index per step; a trailing partial symbol is padded
+        # with erasures
+        n_frames, length = frames.shape
+        n = self.n_outputs
+        steps = -(-length // n)
+        padded = np.full((n_frames, steps * n), ERASED, dtype=np.uint8)
+        padded[:, :length] = frames
+        return padded.reshape(n_frames, steps, n) @ 3 ** np.arange(n - 1, -1, -1)
+
+    def _hard_costs(self, symbols, start, stop):
+        return self.trellis.branch_metrics[symbols[:, start:stop]]
+
+    def _soft_costs(self, llrs, start, stop):
+        # Negated correlation of the LLRs with each branch's +/-1 outputs, so
+        # the same minimising add-compare-select applies.
+        signs = 1.0 - 2.0 * self.trellis.branch_outputs.reshape(-1, self.n_outputs)
+        n_frames, steps = llrs.shape[0], min(stop, llrs.shape[1]) - start
+        costs = -(llrs[:, start:stop] @ signs.T)
+        return costs.reshape(n_frames, steps, 2, self.n_states // 2, 2)
+
+    def _initial_metrics(self, n_frames, dtype=np.int32):
+        if np.issubdtype(dtype, np.floating):
+            unreachable = np.inf
+        else:
+            unreachable = np.iinfo(dtype).max // 2
+        metrics = np.full((n_frames, self.n_states), unreachable, dtype=dtype)
+        metrics[:, 0] = 0
+        return metrics
+
+    def _add_compare_select(self, costs, metrics, decisions):
+        # Runs every step of decisions (steps, N, states) from metrics
+        # (N, states) and returns the final metrics. costs(start, stop) gives
+        # the branch costs of those steps laid out as (N, steps, input bit,
+        # j % half, oldest bit). All states (and frames) are updated at once;
+        # ties keep the predecessor whose oldest bit is 0.
+        steps, n_frames = decisions.shape[:2]
+        half = self.n_states // 2
+        metrics = metrics.reshape(n_frames, half, 2)
+        decisions = decisions.reshape(steps, n_frames, 2, half)
+        for start in range(0, steps, _METRIC_CHUNK):
+            branch = costs(start, start + _METRIC_CHUNK)
+            for t in range(branch.shape[1]):
+                candidates = branch[:, t] + metrics[:, None]
+                older, newer = candidates[..., 1], candidates[..., 0]
+                np.less(older, newer, out=decisions[start + t])
+                metrics = np.minimum(newer, older).reshape(n_frames, half, 2)
+            metrics -= metrics.min(axis=(1, 2), keepdims=True)
+        return metrics.reshape(n_frames, self.n_states)
+
+    def _best_state(self, metrics):
+        tie_order = self.trellis.tie_order
+        return tie_order[np.argmin(metrics[:, tie_order], axis=1)]
+
+    def _segments(self, steps):
+        # Long frames are cut into overlapping windows decoded side by side
+        # as one batch, so the add-compare-select loop runs over a window's
+        # steps instead of the whole frame's. Every window but the first
+        # starts from an unknown state and keeps its decisions only after
+        # `warmup` steps; every window but the last runs `warmup` steps past
+        # what it keeps. Returns the window length, window starts and the
+        # boundaries of the kept steps, or None to decode the frame whole.
+        warmup = _SEGMENT_WARMUP * self.constraint_length
+        kept = min(max(steps // 16, _SEGMENT_STEPS[0]), _SEGMENT_STEPS[1])
+        window = kept + 2 * warmup
+        if steps < 2 * window:
+            return None
+        bounds = [0, kept + warmup]
+        while steps - bounds[-1] > kept + warmup:
+            bounds.append(bounds[-1] + kept)
+        bounds.append(steps)
+        # the last window ends with the frame, so it ends exactly as a whole decode
+        starts = [0] + [b - warmup for b in bounds[1:-2]] + [steps - window]
+        return window, np.array(starts), bounds
+
+    def _viterbi(self, per_step, step_costs, dtype, single):
+        # per_step is (N, steps, ...) received data, step_costs(per_step,
+        # start, stop) its branch costs
+        n_frames, steps = per_step.shape[:2]
+        if steps == 0:
+            return np.zeros((0,) if single else (n_frames, 0), dtype=np.uint8)
+
+        segments = self._segments(steps)
+        if segments is None:
+            decoded = self._decode_frames(per_step, step_costs, self._initial_metrics(n_frames, dtype))
+            return decoded[0] if single else decoded
+
+        window, starts, bounds = segments
+        windows = per_step[:, starts[:, None] + np.arange(window)]
+        windows = windows.reshape(n_frames * len(starts), window, *per_step.shape[2:])
+        metrics = self._initial_metrics(len(windows), dtype)
+        metrics.reshape(n_frames, len(starts), -1)[:, 1:] = 0  # any start state
+        decoded = self._decode_frames(windows, step_costs, metrics).reshape(n_frames, len(starts), window)
+        decoded = np.concatenate([decoded[:, i, low - start:high - start] for i, (start, low, high)
+                                  in enumerate(zip(starts, bounds[:-1], bounds[1:]))], axis=1)
+        return decoded[0] if single else decoded
+
+    def _decode_frames(self, per_step, step_costs, metrics):
+        n_frames, steps = per_step.shape[:2]
+        decisions = np.empty((steps, n_frames, self.n_states), dtype=np.uint8)
+        metrics = self._add_compare_select(partial(step_costs, per_step), metrics, decisions)
+        half = self.n_states // 2
+        rows = np.arange(n_frames)
+        state = self._best_state(metrics)
+        decoded = np.empty((n_frames, steps), dtype=np.uint8)
+        for t in range(steps - 1, -1, -1):
+            decoded[:, t] = state // half
+            state = (state % half) * 2 + decisions[t, rows, state]
+        return decoded
+
+    @profiled(arg=1)
+    def decode(self, received):
+        """Hard-decision Viterbi decode of one frame or an (N, L) batch.
+
+        Received bits are 0/1, or ERASED for positions without information;
+        a trailing partial symbol is padded with erasures. Returns a uint8
+        array of decoded bits, one row per input frame.
+        """
+        received = np.asarray(received, dtype=np.uint8)
+        symbols = self._symbols(self.depuncture(np.atleast_2d(received)))
+        return self._viterbi(symbols, self._hard_costs, np.int32, received.ndim == 1)
+
+    @profiled(arg=1)
+    def decode_soft(self, llrs):
+        """Soft-decision Viterbi decode of one frame or an (N, L) batch.
+
+        Takes channel LLRs (positive favours 0, as from
+        ecc.channel.bpsk_awgn(..., soft=True)) and picks the path with the
+        largest correlation. Punctured and missing positions count as 0.
+        """
+        llrs = np.asarray(llrs, dtype=np.float64)
+        frames = self.depuncture(np.atleast_2d(llrs), fill=0.0)
+        n_frames, length = frames.shape
+        n = self.n_outputs
+        steps = -(-length // n)
+        padded = np.zeros((n_frames, steps * n))
+        padded[:, :length] = frames
+        return self._viterbi(padded.reshape(n_frames, steps, n), self._soft_costs, np.float64,
+                             llrs.ndim == 1)
+
+    def _traceback(self, decisions, state):
+        half = self.n_states // 2
+        decoded = np.empty(len(decisions), dtype=np.uint8)
+        for t in range(len(decisions) - 1, -1, -1):
+            decoded[t] = state // half
+            state = (state % half) * 2 + decisions[t, state]
+        return decoded
+
+
+class StreamingViterbiDecoder:
+    """Sliding-window Viterbi decoder for an unbounded received bit stream.
+
+    Survivor decisions are kept for traceback_depth steps plus one output
+    block, so memory stays constant however long the stream runs. Each
+    block is released once traceback_depth newer steps have been seen,
+    tracing back from the currently best state; flush() releases the rest
+    the way the block decoder ends a frame. The output therefore equals
+    ConvolutionalCode.decode() whenever survivor paths merge within the
+    traceback depth, which the default of 5 * K makes all but certain at
+    error rates the code can correct.
+    """
+
+    def __init__(self, code=None, traceback_depth=None, block=None):
+        self.code = code or DEFAULT_CODE
+        self.traceback_depth = traceback_depth or 5 * self.code.constraint_length
+        self.block = block or self.traceback_depth
+        window = self.traceback_depth + self.block
+        self._decisions = np.empty((window, 1, self.code.n_states), dtype=np.uint8)
+        self._unit = (
+            self.code.n_outputs if self.code.puncture is None
+            else int(self.code.puncture.sum())
+        )
+        self.reset()
+
+    def reset(self):
+        self._metrics = self.code._initial_metrics(1)
+        self._filled = 0
+        self._pending = np.zeros(0, dtype=np.uint8)
+
+    def _advance(self, frames):
+        symbols = self.code._symbols(frames)
+        out = []
+        start = 0
+        while start < symbols.shape[1]:
+            chunk = symbols[:, start:start + len(self._decisions) - self._filled]
+            steps = chunk.shape[1]
+            start += steps
+            window = self._decisions[self._filled:self._filled + steps]
+            costs = partial(self.code._hard_costs, chunk)
+            self._metrics = self.code._add_compare_select(costs, self._metrics, window)
+            self._filled += steps
+            if self._filled == len(self._decisions):
+                state = int(self.code._best_state(self._metrics)[0])
+                out.append(self.code._traceback(self._decisions[:, 0], state)[:self.block])
+                self._decisions[:self.traceback_depth] = self._decisions[self.block:]
+                self._filled = self.traceback_depth
+        return out
+
+    def feed(self, bits):
+        """Consume received bits and return whatever decoded bits are final."""
+        bits = np.concatenate([self._pending, np.asarray(bits, dtype=np.uint8).reshape(-1)])
+        usable = len(bits) - len(bits) % self._unit
+        self._pending = bits[usable:]
+        out = self._advance(self.code.depuncture(bits[None, :usable]))
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.uint8)
+
+    def flush(self):
+        """Decode leftover bits and release the remaining window, then reset."""
+        out = self._advance(self.code.depuncture(self._pending[None, :]))
+        if self._filled:
+            state = int(self.code._best_state(self._metrics)[0])
+            out.append(self.code._traceback(self._decisions[:self._filled, 0], state))
+        self.reset()
+        return np.concatenate(out) if out else np.zeros(0, dtype=np.uint8)
+
+    def decode(self, chunks):
+        """Generator yielding decoded bits as the chunks are consumed."""
+        for chunk in chunks:
+            bits = self.feed(chunk)
+            if len(bits):
+                yield bits
+        bits = self.flush()
+        if len(bits):
+            yield bits
+
+
 # Generator polynomials: G1 = 111, G2 = 101
+DEFAULT_CODE = ConvolutionalCode((0o7, 0o5), 3)
+
+
+# conv_encode/conv_decode take a bit string or a BitBuffer and return the same kind.
+
+@profiled()
 def conv_encode(bits):
-    state = [0, 0]
-    encoded = []
-    for bit in bits:
-        bit = int(bit)
-        state = [bit] + state[:2]
-        out1 = state[0] ^ state[1] ^ state[2]
-        out2 = state[0] ^ state[2]
-        encoded.extend([out1, out2])
-    return ''.join(map(str, encoded))
+    return like(DEFAULT_CODE.encode(as_bits(bits)), bits)
 
 def hamming_distance(s1, s2):
     return sum(c1 != c2 for c1, c2 in zip(s1, s2))
 
+@profiled()
+def viterbi_decode(received):
+    return DEFAULT_CODE.decode(received)
+
+@profiled()
 def conv_decode(encoded_bits):
-    n = 2  # 2 output bits per input
-    k = 3  # Constraint length
-    states = {
-        '00': ['00', '10'],
-        '01': ['00', '10'],
-        '10': ['01', '11'],
-        '11': ['01', '11']
-    }
-
-    # State transition: (current_state, input_bit) -> (next_state, output)
-    transitions = {
-        '00': {'0': ('00', '00'), '1': ('10', '11')},
-        '01': {'0': ('00', '11'), '1': ('10', '00')},
-        '10': {'0': ('01', '10'), '1': ('11', '01')},
-        '11': {'0': ('01', '01'), '1': ('11', '10')}
-    }
-
-    paths = {'00': ('', 0)}  # state -> (path, score)
-
-    for i in range(0, len(encoded_bits), 2):
-        new_paths = {}
-        segment = encoded_bits[i:i+2]
-
-        for state in paths:
-            for input_bit in ['0', '1']:
-                next_state, out = transitions[state][input_bit]
-                dist = hamming_distance(segment, out)
-                score = paths[state][1] + dist
-                path = paths[state][0] + input_bit
-
-                if next_state not in new_paths or score < new_paths[next_state][1]:
-                    new_paths[next_state] = (path, score)
-        paths = new_paths
-
-    best_path = min(paths.values(), key=lambda x: x[1])[0]
-    return best_path
+    return like(DEFAULT_CODE.decode(as_bits(encoded_bits)), encoded_bits)
@@ -0,0 +1,127 @@
+# ecc/error_analytics.py
+# Running statistics of where errors land, accumulated over batches of
+# frames without keeping the frames: per-position counts of channel errors
+# (sent vs received) and residual errors (data vs decoded), how many errors
+# each frame had, the lengths of error bursts, and optionally the weights
+# of the decoder's syndromes. Every update is a few XORs and bincounts over
+# the whole batch. Histograms grow to the longest frame seen, so frames of
+# different lengths (as in the GUI) can share one accumulator; snapshots
+# are plain dicts that merge() folds back in, e.g. from worker processes.
+import numpy as np
+
+DEFAULT_MAX_BURST = 64
+
+HISTOGRAMS = (
+    'channel_positions',   # channel errors per codeword bit position
+    'residual_positions',  # residual errors per data bit position
+    'channel_weights',     # frames by number of channel errors
+    'residual_weights',    # frames by number of residual errors
+    'channel_bursts',      # channel error bursts by length (last bin: longer)
+    'residual_bursts',     # residual error bursts by length
+    'syndrome_weights',    # frames by syndrome weight
+)
+
+
+def _rows(bits):
+    bits = np.asarray(bits)
+    if bits.dtype != np.uint8 and bits.dtype != bool:
+        bits = bits.astype(np.uint8)
+    return np.atleast_2d(bits)
+
+
+def burst_lengths(errors):
+    """Lengths of the runs of consecutive errors in every row of a 0/1
+    (N, L) array, as one flat array."""
+    errors = np.atleast_2d(errors).astype(np.int8)
+    padded = np.zeros((errors.shape[0], errors.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = errors
+    # the zero columns keep runs of neighbouring rows apart once flattened
+    edges = np.diff(padded.reshape(-1))
+    return np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+
+
+def _add(total, counts):
+    # total += counts, growing total first if counts is longer
+    if len(counts) > len(total):
+        total = np.concatenate([total, np.zeros(len(counts) - len(total), dtype=np.int64)])
+    total[:len(counts)] += counts
+    return total
+
+
+class ErrorAnalytics:
+    """Accumulator of error statistics over (data, sent, received, decoded)
+    batches. syndrome_weight, if given, maps the (N, L) received bits to
+    the (N,) syndrome weight of each frame."""
+
+    def __init__(self, max_burst=DEFAULT_MAX_BURST, syndrome_weight=None):
+        self.max_burst = max_burst
+        self.syndrome_weight = syndrome_weight
+        self.reset()
+
+    def reset(self):
+        self.frames = 0
+        for name in HISTOGRAMS:
+            setattr(self, name, np.zeros(0, dtype=np.int64))
+
+    def _bursts(self, errors):
+        lengths = np.minimum(burst_lengths(errors), self.max_burst)
+        return np.bincount(lengths, minlength=self.max_burst + 1)
+
+    def update(self, data, sent, received, decoded):
+        """Count one batch: data and decoded are (N, K) data bits, sent and
+        received (N, L) codeword bits (hard decisions). Decoded rows longer
+        than the data are cut to it."""
+        data, sent, received = _rows(data), _rows(sent), _rows(received)
+        decoded = _rows(decoded)[:, :data.shape[1]]
+        channel = sent != received
+        residual = data != decoded
+
+        self.frames += len(data)
+        self.channel_positions = _add(self.channel_positions, channel.sum(axis=0))
+        self.residual_positions = _add(self.residual_positions, residual.sum(axis=0))
+        self.channel_weights = _add(self.channel_weights, np.bincount(channel.sum(axis=1)))
+        self.residual_weights = _add(self.residual_weights, np.bincount(residual.sum(axis=1)))
+        self.channel_bursts = _add(self.channel_bursts, self._bursts(channel))
+        self.residual_bursts = _add(self.residual_bursts, self._bursts(residual))
+        if self.syndrome_weight is not None:
+            weights = np.asarray(self.syndrome_weight(received), dtype=np.int64)
+            self.syndrome_weights = _add(self.syndrome_weights, np.bincount(weights))
+
+    def snapshot(self):
+        """Plain-dict copy of the counts (JSON-serialisable, picklable)."""
+        snapshot = {'frames': self.frames, 'max_burst': self.max_burst}
+        for name in HISTOGRAMS:
+            snapshot[name] = getattr(self, name).tolist()
+        return snapshot
+
+    def merge(self, snapshot):
+        """Fold in a snapshot taken from another accumulator."""
+        self.frames += snapshot['frames']
+        for name in HISTOGRAMS:
+            setattr(self, name, _add(getattr(self, name), np.asarray(snapshot[name], dtype=np.int64)))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        analytics = cls(snapshot.get('max_burst', DEFAULT_MAX_BURST))
+        analytics.merge(snapshot)
+        return analytics
+
+    def summary(self):
+        """Headline numbers: mean errors per frame, the share of frames
+        left with residual errors and the longest bursts seen."""
+        def mean(weights):
+            return float(np.arange(len(weights)) @ weights / self.frames) if self.frames else 0.0
+
+        def longest(bursts):
+            seen = np.flatnonzero(bursts)
+            return int(seen[-1]) if len(seen) else 0
+
+        return {
+            'frames': self.frames,
+            'mean_channel_errors': mean(self.channel_weights),
+            'mean_residual_errors': mean(self.residual_weights),
+            'residual_frame_rate': float(1 - self.residual_weights[0] / self.frames)
+                                   if self.frames and len(self.residual_weights) else 0.0,
+            'longest_channel_burst': longest(self.channel_bursts),
+            'longest_residual_burst': longest(self.residual_bursts),
+        }
@@ -1,4 +1,5 @@
 import matplotlib.pyplot as plt
+import numpy as np
 
 def plot_error_patterns(original, noisy, decoded, title="Error Pattern Visualization"):
     fig, axs = plt.subplots(3, 1, figsize=(10, 6), sharex=True)
@@ -16,3 +17,69 @@ def plot_error_patterns(original, noisy, decoded, title="Error Pattern Visualiza
     plt.xlabel('Bit Position')
     plt.tight_layout()
     plt.show()
+
+
+def plot_error_analytics(analytics, title="Error Analytics"):
+    """Aggregated view of an ecc.error_analytics.ErrorAnalytics (or its
+    snapshot): channel and residual errors per bit position, errors per
+    frame, burst lengths and, when tracked, syndrome weights. The figure is
+    looked up by title, so plotting the same accumulator again redraws it
+    in place instead of opening another window."""
+    if isinstance(analytics, dict):
+        from ecc.error_analytics import ErrorAnalytics
+        analytics = ErrorAnalytics.from_snapshot(analytics)
+    fig = plt.figure(num=title, figsize=(12, 8))
+    fig.clf()
+    axs = fig.subplots(2, 2)
+
+    def bars(ax, counts, label, color, offset=0.0):
+        if len(counts):
+            ax.bar(np.arange(len(counts)) + offset, counts, width=0.4 if offset else 0.8,
+                   color=color, label=label, align='center')
+
+    ax = axs[0, 0]
+    ax.step(np.arange(len(analytics.channel_positions)), analytics.channel_positions,
+            where='mid', color='red', label='Channel (codeword bits)')
+    ax.step(np.arange(len(analytics.residual_positions)), analytics.residual_positions,
+            where='mid', color='green', label='Residual (data bits)')
+    ax.set_title('Errors per Bit Position')
+    ax.set_xlabel('Bit Position')
+    ax.legend()
+
+    ax = axs[0, 1]
+    bars(ax, analytics.channel_weights, 'Channel', 'red', -0.2)
+    bars(ax, analytics.residual_weights, 'Residual', 'green', 0.2)
+    ax.set_title('Errors per Frame')
+    ax.set_xlabel('Errors')
+    ax.set_ylabel('Frames')
+    ax.legend()
+
+    ax = axs[1, 0]
+    summary = analytics.summary()
+    longest = max(summary['longest_channel_burst'], summary['longest_residual_burst'])
+    bars(ax, analytics.channel_bursts[1:longest + 1], 'Channel', 'red', 0.8)
+    bars(ax, analytics.residual_bursts[1:longest + 1], 'Residual', 'green', 1.2)
+    ax.set_title(f'Burst Lengths (last bin: {analytics.max_burst} or longer)')
+    ax.set_xlabel('Burst Length (bits)')
+    ax.set_ylabel('Bursts')
+    if analytics.channel_bursts.any() or analytics.residual_bursts.any():
+        ax.set_yscale('log')
+    ax.legend()
+
+    ax = axs[1, 1]
+    if analytics.syndrome_weights.any():
+        bars(ax, analytics.syndrome_weights, 'Syndrome', 'purple')
+        ax.set_title('Syndrome Weight per Frame')
+        ax.set_xlabel('Syndrome Weight')
+        ax.set_ylabel('Frames')
+    else:
+        ax.axis('off')
+        ax.text(0.05, 0.95, '\n'.join(f'{k.replace("_", " ")}: {v:.4g}' if isinstance(v, float)
+                                      else f'{k.replace("_", " ")}: {v}'
+                                      for k, v in summary.items()),
+                va='top', family='monospace', transform=ax.transAxes)
+
+    fig.suptitle(f'{title} ({analytics.frames} frames)', fontsize=16)
+    fig.tight_layout()
+    plt.show()
+    return fig
@@ -0,0 +1,150 @@
+# ecc/frame_codecs.py
+# Fixed-size frame adapters giving every codec the same batched interface:
+# encode() maps (N, data_bits) bit arrays to (N, code_bits) and decode()
+# maps them back. Used by the simulation engine and anything else that
+# needs to treat codecs interchangeably. `version` is bumped whenever a
+# codec's output changes, which invalidates its stored results
+# (ecc.result_store).
+import numpy as np
+
+from ecc.convolutional import ConvolutionalCode
+from ecc.hamming import DEFAULT_CODE, hamming_code, hamming_decode_soft
+from ecc.pipeline import concatenated
+from ecc.rs_batch import RSBatchCodec
+
+
+class HammingFrameCodec:
+    name = 'hamming'
+    version = 3
+
+    def __init__(self, frame_bits=1024, m=3, extended=False, block_bits=None):
+        self.code = hamming_code(m, extended, block_bits)
+        self.soft = self.code is DEFAULT_CODE  # ML soft decoding enumerates the 16 codewords
+        k = self.code.k
+        self.data_bits = max(k, frame_bits - frame_bits % k)
+        self.code_bits = self.data_bits // k * self.code.n
+
+    def params(self):
+        return {'frame_bits': self.data_bits, 'm': self.code.m, 'extended': self.code.extended,
+                'block_bits': self.code.k}
+
+    def encode(self, bits):
+        return self.code.encode(bits.reshape(-1, self.code.k)).reshape(len(bits), -1)
+
+    def decode(self, received):
+        return self.code.decode(received.reshape(-1, self.code.n))[0].reshape(len(received), -1)
+
+    def decode_soft(self, llrs):
+        return hamming_decode_soft(llrs.reshape(-1, 7)).reshape(len(llrs), -1)
+
+    def syndrome_weight(self, received):
+        """Per frame: the number of set syndrome bits over all its blocks."""
+        syndromes = self.code.syndrome(received.reshape(-1, self.code.n))
+        bits = syndromes[:, None] >> np.arange(self.code.m + self.code.extended) & 1
+        return bits.reshape(len(received), -1).sum(axis=1)
+
+
+class ConvolutionalFrameCodec:
+    """Frames terminated with K - 1 zero tail bits, so the last data bits are
+    protected as well as the rest."""
+
+    name = 'convolutional'
+    version = 2
+    soft = True
+
+    def __init__(self, frame_bits=1024, generators=(0o7, 0o5), constraint_length=3, puncture=None):
+        self.code = ConvolutionalCode(generators, constraint_length, puncture)
+        self.puncture = puncture
+        self.data_bits = frame_bits
+        self.code_bits = self.code.encoded_length(frame_bits + self.code.memory)
+
+    def params(self):
+        return {
+            'frame_bits': self.data_bits,
+            'generators': list(self.code.generators),
+            'constraint_length': self.code.constraint_length,
+            'puncture': self.puncture,
+        }
+
+    def encode(self, bits):
+        return self.code.encode(np.pad(bits, ((0, 0), (0, self.code.memory))))
+
+    def decode(self, received):
+        return self.code.decode(received)[:, :self.data_bits]
+
+    def decode_soft(self, llrs):
+        return self.code.decode_soft(llrs)[:, :self.data_bits]
+
+
+class ReedSolomonFrameCodec:
+    name = 'reed-solomon'
+    version = 1
+    soft = False
+
+    def __init__(self, frame_bits=1024, nsym=10):
+        self.nsym = nsym
+        self.data_bytes = max(1, min(frame_bits // 8, 255 - nsym))
+        self.data_bits = self.data_bytes * 8
+        self.code_bits = (self.data_bytes + nsym) * 8
+        self._rs = RSBatchCodec(nsym)
+
+    def params(self):
+        return {'frame_bits': self.data_bits, 'nsym': self.nsym}
+
+    def encode(self, bits):
+        return np.unpackbits(self._rs.encode(np.packbits(bits, axis=1)), axis=1)
+
+    def decode(self, received):
+        # uncorrectable rows keep their systematic bytes as received
+        messages, _ = self._rs.decode(np.packbits(received, axis=1))
+        return np.unpackbits(messages, axis=1)
+
+
+class ConcatenatedFrameCodec:
+    """Outer RS, symbol interleaved over `depth` codewords, with an inner
+    convolutional code (ecc.pipeline.concatenated)."""
+
+    name = 'concatenated'
+    version = 1
+    soft = True
+
+    def __init__(self, frame_bits=1024, nsym=16, depth=4, generators=(0o7, 0o5),
+                 constraint_length=3, puncture=None):
+        self.pipeline = concatenated(frame_bits, nsym, depth, generators, constraint_length, puncture)
+        self.nsym, self.depth, self.puncture = nsym, depth, puncture
+        self.data_bits = self.pipeline.data_bits
+        self.code_bits = self.pipeline.code_bits
+
+    def params(self):
+        conv = self.pipeline.stages[-1].code
+        return {
+            'frame_bits': self.data_bits,
+            'nsym': self.nsym,
+            'depth': self.depth,
+            'generators': list(conv.generators),
+            'constraint_length': conv.constraint_length,
+            'puncture': self.puncture,
+        }
+
+    def encode(self, bits):
+        return self.pipeline.encode(bits)
+
+    def decode(self, received):
+        return self.pipeline.decode(received)
+
+    def decode_soft(self, llrs):
+        return self.pipeline.decode_soft(llrs)
+
+
+CODECS = {
+    HammingFrameCodec.name: HammingFrameCodec,
+    ConvolutionalFrameCodec.name: ConvolutionalFrameCodec,
+    ReedSolomonFrameCodec.name: ReedSolomonFrameCodec,
+    ConcatenatedFrameCodec.name: ConcatenatedFrameCodec,
+}
+
+
+def make_codec(name, **params):
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec: {name!r}")
+    return CODECS[name](**params)
@@ -1,17 +1,259 @@
+from functools import lru_cache
+
+import numpy as np
+
+from ecc.bitbuffer import BitBuffer, as_bits, like
+from ecc.profiling import profiled
+
+# Block status reported by HammingCode.decode
+CLEAN, CORRECTED, DETECTED = 0, 1, -1
+
+
+class HammingCode:
+    """Hamming code with m parity bits: (2^m - 1, 2^m - 1 - m), optionally
+    shortened to `data_bits` and/or extended with an overall parity bit
+    (SECDED: single error correction, double error detection).
+
+    Bits sit at their classic 1-based positions (parity bits at the powers
+    of two), so the syndrome of a single error is its position. Encoding and
+    syndrome computation go through per-byte lookup tables over packed rows;
+    the syndrome (plus the overall parity bit when extended) then indexes a
+    correction table giving the error pattern and block status. Build codes
+    with hamming_code() so the tables are made once per code.
+    """
+
+    def __init__(self, m, extended=False, data_bits=None):
+        if m < 2:
+            raise ValueError("A Hamming code needs at least 2 parity bits")
+        full_k = 2 ** m - 1 - m
+        k = full_k if data_bits is None else data_bits
+        if not 0 < k <= full_k:
+            raise ValueError(f"data_bits must be in 1..{full_k} for m={m}")
+        self.m, self.k, self.extended = m, k, extended
+
+        positions = np.arange(1, 2 ** m)
+        is_parity = (positions & (positions - 1)) == 0
+        # shortening drops the highest data positions (always zero)
+        kept = np.concatenate([positions[is_parity], positions[~is_parity][:k]])
+        self.positions = np.sort(kept)  # 1-based position of each column
+        self.n = len(self.positions) + extended
+        self.data_positions = np.flatnonzero((self.positions & (self.positions - 1)) != 0)
+        self.parity_positions = np.flatnonzero((self.positions & (self.positions - 1)) == 0)
+        # encode() builds [data | parity | overall] and reorders it in one take
+        self._layout = np.argsort(np.concatenate([self.data_positions, self.parity_positions,
+                                                  [self.n - 1] if extended else []]))
+
+        # Column j of H is the binary form of positions[j]; the extended
+        # code checks the syndrome and the overall parity separately.
+        self.parity_check = (self.positions >> np.arange(m)[:, None] & 1).astype(np.uint8)
+        generator = np.zeros((k, self.n), dtype=np.uint8)
+        generator[np.arange(k), self.data_positions] = 1
+        generator[:, self.parity_positions] = self.parity_check[:, self.data_positions].T
+        if extended:
+            generator[:, -1] = generator.sum(axis=1) & 1
+        self.generator = generator
+
+        # Per-byte tables over MSB-first packed rows: the XOR of the data
+        # positions set in a data byte, and the syndrome (bit m = overall
+        # parity) contributed by a received byte.
+        column_syndrome = self.positions | (1 << m if extended else 0)
+        if extended:
+            column_syndrome = np.append(column_syndrome, 1 << m)
+        self._encode_table = _byte_table(self.positions[self.data_positions])
+        self._syndrome_table = _byte_table(column_syndrome)
+
+        # (syndrome | overall parity << m) -> error pattern and status
+        size = 2 ** (m + extended)
+        self.correction = np.zeros((size, self.n), dtype=np.uint8)
+        self.status = np.full(size, DETECTED, dtype=np.int8)
+        self.status[0] = CLEAN
+        column_of = dict(zip(self.positions.tolist(), range(len(self.positions))))
+        for syndrome in range(1, 2 ** m):
+            index = syndrome | (1 << m if extended else 0)
+            if syndrome in column_of:
+                self.correction[index, column_of[syndrome]] = 1
+                self.status[index] = CORRECTED
+        if extended:
+            self.correction[1 << m, -1] = 1
+            self.status[1 << m] = CORRECTED
+        for table in (self.positions, self.data_positions, self.parity_positions, self._layout,
+                      self.parity_check, self.generator, self.correction, self.status):
+            table.setflags(write=False)
+
+    def __repr__(self):
+        return f"HammingCode({self.n},{self.k}{', SECDED' if self.extended else ''})"
+
+    @profiled(arg=1)
+    def encode(self, data):
+        """Encode an (N, k) bit array (or packed bytes) into (N, n)."""
+        rows = _as_bit_rows(data, self.k)
+        parity = _xor_lookup(self._encode_table, rows)
+        parity = (parity[:, None] >> np.arange(self.m) & 1).astype(np.uint8)
+        columns = [rows, parity]
+        if self.extended:
+            columns.append(((rows.sum(axis=1) + parity.sum(axis=1)) & 1)[:, None].astype(np.uint8))
+        return np.concatenate(columns, axis=1).take(self._layout, axis=1)
+
+    @profiled(arg=1)
+    def syndrome(self, received):
+        """Per row: the syndrome, with the overall parity as bit m when extended."""
+        return _xor_lookup(self._syndrome_table, _as_bit_rows(received, self.n))
+
+    @profiled(arg=1)
+    def decode(self, received):
+        """Decode an (N, n) bit array (or packed bytes).
+
+        Returns the (N, k) data bits and an (N,) status per block: CLEAN,
+        CORRECTED, or DETECTED for an uncorrectable error (a double error in
+        a SECDED code, or a syndrome pointing outside a shortened code), in
+        which case the data bits are passed through as received.
+        """
+        rows = _as_bit_rows(received, self.n)
+        index = _xor_lookup(self._syndrome_table, rows)
+        corrected = rows ^ self.correction[index]
+        return corrected.take(self.data_positions, axis=1), self.status[index]
+
+    def encode_bytes(self, payload):
+        """Encode a byte payload of any length in k-bit blocks (the last one
+        zero-padded) and return the packed codewords."""
+        bits = np.unpackbits(np.frombuffer(bytes(payload), dtype=np.uint8))
+        blocks = np.zeros(-(-len(bits) // self.k) * self.k, dtype=np.uint8)
+        blocks[:len(bits)] = bits
+        return np.packbits(self.encode(blocks.reshape(-1, self.k))).tobytes()
+
+    def decode_bytes(self, encoded, length):
+        """Inverse of encode_bytes for a payload of `length` bytes; returns
+        (payload, per-block status). Missing trailing bits read as zero."""
+        n_blocks = -(-length * 8 // self.k)
+        received = np.zeros(n_blocks * self.n, dtype=np.uint8)
+        available = np.unpackbits(np.frombuffer(bytes(encoded), dtype=np.uint8))[:len(received)]
+        received[:len(available)] = available
+        data, status = self.decode(received.reshape(n_blocks, self.n))
+        return np.packbits(data.reshape(-1)[:length * 8]).tobytes(), status
+
+
+def _byte_table(values):
+    # table[j, b] = XOR of values[8j + t] over the bits t of byte b (MSB first)
+    n_bytes = -(-len(values) // 8)
+    padded = np.zeros(n_bytes * 8, dtype=np.int64)
+    padded[:len(values)] = values
+    table = np.zeros((n_bytes, 256), dtype=np.int64)
+    byte = np.arange(256)
+    for t in range(8):
+        table ^= (byte >> (7 - t) & 1) * padded[t::8, None]
+    table.setflags(write=False)
+    return table
+
+
+def _xor_lookup(table, rows):
+    packed = np.packbits(rows, axis=1)
+    return np.bitwise_xor.reduce(table[np.arange(table.shape[0]), packed], axis=1)
+
+
+@lru_cache(maxsize=None)
+def _cached_code(m, extended, data_bits):
+    return HammingCode(m, extended, data_bits)
+
+
+def hamming_code(m, extended=False, data_bits=None):
+    """The HammingCode for these parameters, built once and shared."""
+    if data_bits == 2 ** m - 1 - m:
+        data_bits = None
+    return _cached_code(m, bool(extended), data_bits)
+
+
+# "n,k" -> hamming_code() arguments
+NAMED_CODES = {
+    '7,4': (3, False, None),
+    '15,11': (4, False, None),
+    '31,26': (5, False, None),
+    '8,4': (3, True, None),
+    '16,11': (4, True, None),
+    '39,32': (6, True, 32),
+    '72,64': (7, True, 64),
+}
+
+
+def named_code(name):
+    if name not in NAMED_CODES:
+        raise ValueError(f"Unknown Hamming code: {name!r} (choose from {', '.join(NAMED_CODES)})")
+    return hamming_code(*NAMED_CODES[name])
+
+
+DEFAULT_CODE = hamming_code(3)
+SECDED_72_64 = named_code('72,64')
+
+# Codeword layout: p1 p2 d0 p3 d1 d2 d3
+GENERATOR = DEFAULT_CODE.generator
+
+# Column j of the parity-check matrix is the binary form of j + 1, so the
+# syndrome read as an integer is the 1-based position of a single error.
+PARITY_CHECK = DEFAULT_CODE.parity_check
+
+DATA_POSITIONS = DEFAULT_CODE.data_positions
+SYNDROME_WEIGHTS = np.array([1, 2, 4], dtype=np.uint8)
+
+# syndrome -> error pattern to XOR onto the received word
+CORRECTION_TABLE = DEFAULT_CODE.correction
+
+# every data nibble (MSB first) and its codeword, for ML soft decoding
+ALL_DATA = (np.arange(16)[:, None] >> np.arange(3, -1, -1) & 1).astype(np.uint8)
+CODEWORD_SIGNS = 1.0 - 2.0 * (ALL_DATA @ GENERATOR & 1)
+
+
+def _as_bit_rows(data, width):
+    # Packed buffers are unpacked MSB-first; trailing bits that do not fill
+    # a whole row are padding and get dropped. A BitBuffer knows its exact
+    # length, so it has to be a whole number of rows.
+    if isinstance(data, BitBuffer):
+        bits = data.to_bits()
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+        bits = bits[:len(bits) - len(bits) % width]
+    else:
+        bits = np.asarray(data, dtype=np.uint8)
+    return bits.reshape(-1, width)
+
+
+@profiled()
+def hamming_encode_batch(data):
+    """Encode an (N, 4) bit array (or packed bytes) into an (N, 7) array."""
+    rows = _as_bit_rows(data, 4)
+    return (rows @ GENERATOR & 1).astype(np.uint8)
+
+
+@profiled()
+def hamming_decode_batch(encoded):
+    """Decode an (N, 7) bit array (or packed bytes).
+
+    Returns the (N, 4) corrected data bits and an (N,) vector with the
+    1-based position that was flipped in each row, 0 when none was.
+    """
+    rows = _as_bit_rows(encoded, 7)
+    error_pos = (rows @ PARITY_CHECK.T & 1) @ SYNDROME_WEIGHTS
+    corrected = rows ^ CORRECTION_TABLE[error_pos]
+    return corrected[:, DATA_POSITIONS], error_pos
+
+
+@profiled()
+def hamming_decode_soft(llrs):
+    """Maximum-likelihood decode of (N, 7) channel LLRs (positive favours 0).
+
+    Correlates every row against all 16 codewords in one matrix product and
+    returns the (N, 4) data bits of the best match.
+    """
+    llrs = np.asarray(llrs, dtype=np.float64).reshape(-1, 7)
+    return ALL_DATA[np.argmax(llrs @ CODEWORD_SIGNS.T, axis=1)]
+
+
+# hamming_encode/hamming_decode take one block as a bit string or a
+# BitBuffer and return the same kind.
+
+@profiled()
 def hamming_encode(data):
-    d = list(map(int, data))
-    p1 = d[0] ^ d[1] ^ d[3]
-    p2 = d[0] ^ d[2] ^ d[3]
-    p3 = d[1] ^ d[2] ^ d[3]
-    return f"{p1}{p2}{d[0]}{p3}{d[1]}{d[2]}{d[3]}"
+    return like(hamming_encode_batch(as_bits(data))[0], data)
 
+@profiled()
 def hamming_decode(encoded):
-    e = list(map(int, encoded))
-    s1 = e[0] ^ e[2] ^ e[4] ^ e[6]
-    s2 = e[1] ^ e[2] ^ e[5] ^ e[6]
-    s3 = e[3] ^ e[4] ^ e[5] ^ e[6]
-    error_pos = s1 * 1 + s2 * 2 + s3 * 4
-    if error_pos != 0:
-        e[error_pos - 1] ^= 1
-    decoded = f"{e[2]}{e[4]}{e[5]}{e[6]}"
-    return decoded, error_pos
+    decoded, error_pos = hamming_decode_batch(as_bits(encoded))
+    return like(decoded[0], encoded), int(error_pos[0])
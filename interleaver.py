@@ -0,0 +1,151 @@
+# ecc/interleaver.py
+# Block and convolutional (Forney) interleavers for spreading channel bursts
+# across codewords. Every variant is a precomputed gather index, cached per
+# (depth, span, length), applied to a frame (L,) or a batch (N, L) in one
+# fancy-indexing step.
+from functools import lru_cache
+
+import numpy as np
+
+
+def _frames(bits):
+    bits = np.asarray(bits)
+    return bits, np.atleast_2d(bits)
+
+
+def _like(bits, frames):
+    return frames[0] if bits.ndim == 1 else frames
+
+
+@lru_cache(maxsize=64)
+def block_permutation(depth, span, length):
+    """(perm, inverse) gather indices of the block interleaver for frames
+    of `length` symbols, read-only and cached: frames[:, perm] interleaves
+    and frames[:, inverse] undoes it."""
+    # Each block of depth * span symbols is written row by row (rows of
+    # `span`) and read column by column; a trailing partial block is left
+    # in place.
+    block = depth * span
+    full = length - length % block
+    order = np.arange(block).reshape(depth, span).T.reshape(-1)
+    perm = np.concatenate([
+        (np.arange(0, full, block)[:, None] + order[None, :]).reshape(-1),
+        np.arange(full, length),
+    ])
+    inverse = np.argsort(perm)
+    for table in (perm, inverse):
+        table.setflags(write=False)
+    return perm, inverse
+
+
+def block_interleave(bits, depth, span):
+    """Interleave depth codewords of span symbols so a burst of up to
+    `depth` symbols hits each codeword at most once."""
+    bits, frames = _frames(bits)
+    perm, _ = block_permutation(depth, span, frames.shape[1])
+    return _like(bits, frames[:, perm])
+
+
+def block_deinterleave(bits, depth, span):
+    bits, frames = _frames(bits)
+    _, inverse = block_permutation(depth, span, frames.shape[1])
+    return _like(bits, frames[:, inverse])
+
+
+# Convolutional interleaver with `depth` branches whose delays grow in steps
+# of `span` cells: symbol i goes through branch i % depth and leaves
+# (i % depth) * span * depth symbols later. The deinterleaver applies the
+# complementary delays, so the pair delays everything by
+# (depth - 1) * span * depth symbols but a burst is spread span * depth apart.
+
+def conv_delay(depth, span):
+    """End-to-end delay in symbols of an interleaver/deinterleaver pair."""
+    return (depth - 1) * span * depth
+
+
+@lru_cache(maxsize=64)
+def _conv_indices(depth, span, length):
+    # Gather indices into the input padded with `delay` fill symbols on both
+    # sides (interleave), and into the interleaved stream (deinterleave).
+    delay = conv_delay(depth, span)
+    t = np.arange(length + delay)
+    interleave = t - (t % depth) * span * depth + delay
+    i = np.arange(length)
+    deinterleave = i + (i % depth) * span * depth
+    for table in (interleave, deinterleave):
+        table.setflags(write=False)
+    return interleave, deinterleave
+
+
+def conv_interleave(bits, depth, span, fill=0):
+    """Interleave a whole frame, flushing the delay lines.
+
+    Returns L + conv_delay(depth, span) symbols per frame; positions the
+    delay lines had not yet filled carry `fill`.
+    """
+    bits, frames = _frames(bits)
+    n_frames, length = frames.shape
+    delay = conv_delay(depth, span)
+    padded = np.full((n_frames, length + 2 * delay), fill, dtype=frames.dtype)
+    padded[:, delay:delay + length] = frames
+    interleave, _ = _conv_indices(depth, span, length)
+    return _like(bits, padded[:, interleave])
+
+
+def conv_deinterleave(bits, depth, span):
+    """Undo conv_interleave; drops the flushed delay symbols."""
+    bits, frames = _frames(bits)
+    length = frames.shape[1] - conv_delay(depth, span)
+    _, deinterleave = _conv_indices(depth, span, length)
+    return _like(bits, frames[:, deinterleave])
+
+
+class StreamingConvolutionalInterleaver:
+    """Convolutional interleaver (or, with inverse=True, deinterleaver) over
+    a continuous stream, fed in chunks of any size.
+
+    Only the last conv_delay(depth, span) symbols of each stream are kept,
+    and chunks may be (L,) or (N, L) for N parallel streams. Output has the
+    same length as the input; a stream passed through an interleaver and a
+    deinterleaver comes out delayed by conv_delay(depth, span) symbols,
+    preceded by `fill`.
+    """
+
+    def __init__(self, depth, span, inverse=False, fill=0):
+        self.depth = depth
+        self.span = span
+        self.inverse = inverse
+        self.fill = fill
+        self.delay = conv_delay(depth, span)
+        self._history = None
+        self._position = 0
+
+    def reset(self):
+        self._history = None
+        self._position = 0
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _indices(depth, span, inverse, phase, length):
+        # Gather into history (delay symbols) + chunk for a chunk starting at
+        # an absolute position congruent to `phase` modulo depth.
+        delay = conv_delay(depth, span)
+        t = np.arange(length) + phase
+        branch = t % depth
+        if inverse:
+            branch = depth - 1 - branch
+        index = np.arange(length) + delay - branch * span * depth
+        index.setflags(write=False)
+        return index
+
+    def process(self, chunk):
+        chunk, frames = _frames(chunk)
+        if self._history is None:
+            self._history = np.full((frames.shape[0], self.delay), self.fill, dtype=frames.dtype)
+        combined = np.concatenate([self._history, frames], axis=1)
+        index = self._indices(self.depth, self.span, self.inverse,
+                              self._position % self.depth, frames.shape[1])
+        out = combined[:, index]
+        self._history = combined[:, combined.shape[1] - self.delay:]
+        self._position += frames.shape[1]
+        return _like(chunk, out)
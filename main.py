@@ -1,12 +1,15 @@
 # main.py
+# GUI entry point; for headless use run `python -m ecc` instead, which never
+# imports PyQt5 or matplotlib.
 from ui.window import launch_app
-from ui.bitplot import visualize_bits, show_live_accuracy_dashboard
 
 # To show bit visualization
+# from ui.bitplot import visualize_bits
 # visualize_bits("Hamming Demo", ["Input", "Encoded"], [["1", "0", "1"], ["1", "1", "0"]], highlights=[[False, True, False], [True, False, True]])
 
 # To launch the live dashboard
-show_live_accuracy_dashboard()
+# from ui.bitplot import show_live_accuracy_dashboard
+# show_live_accuracy_dashboard()
 
 if __name__ == "__main__":
     launch_app()
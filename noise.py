@@ -1,30 +1,57 @@
 
-import random
+import numpy as np
 
+from ecc.bitbuffer import BitBuffer
+from ecc.channel import binary_symmetric, burst_errors, fixed_flips
+from ecc.interleaver import block_deinterleave, block_interleave
+from ecc.profiling import profiled
+
+# String/bytes front end to ecc.channel for the GUI. Bit strings come back as
+# bit strings, BitBuffers as BitBuffers and byte buffers (e.g. Reed-Solomon
+# codewords) as bytearrays with the chosen bits flipped.
+
+def _to_bits(data):
+    if isinstance(data, str):
+        return np.frombuffer(data.encode(), dtype=np.uint8) - ord('0')
+    if isinstance(data, BitBuffer):
+        return data.to_bits()
+    return np.unpackbits(np.frombuffer(bytes(data), dtype=np.uint8))
+
+def _from_bits(bits, like):
+    if isinstance(like, str):
+        return (bits + ord('0')).tobytes().decode()
+    if isinstance(like, BitBuffer):
+        return BitBuffer.from_bits(bits)
+    return bytearray(np.packbits(bits).tobytes())
+
+@profiled()
 def flip_bit_str(data: str, index: int) -> str:
+    if isinstance(data, BitBuffer):
+        return data.flip(index)
     lst = list(data)
     lst[index] = '1' if lst[index] == '0' else '0'
     return ''.join(lst)
 
-def flip_random_bits(data: str, flip_count: int = 1) -> str:
-    lst = list(data)
-    indices = random.sample(range(len(lst)), flip_count)
-    for idx in indices:
-        lst[idx] = '1' if lst[idx] == '0' else '0'
-    return ''.join(lst)
+@profiled()
+def flip_random_bits(data, flip_count: int = 1, rng=None):
+    return _from_bits(fixed_flips(_to_bits(data), flip_count, rng), data)
 
-def burst_flip(data: str, burst_length: int = 3) -> str:
-    lst = list(data)
-    if len(lst) < burst_length:
-        return flip_random_bits(data, 1)
-    start = random.randint(0, len(lst) - burst_length)
-    for i in range(start, start + burst_length):
-        lst[i] = '1' if lst[i] == '0' else '0'
-    return ''.join(lst)
+@profiled()
+def burst_flip(data, burst_length: int = 3, rng=None):
+    return _from_bits(burst_errors(_to_bits(data), burst_length, rng), data)
 
-def gaussian_flip(data: str, intensity: float = 0.2) -> str:
-    lst = list(data)
-    for i in range(len(lst)):
-        if random.random() < intensity:
-            lst[i] = '1' if lst[i] == '0' else '0'
-    return ''.join(lst)
+@profiled()
+def interleaved_burst_flip(data, burst_length: int = 3, span: int = 7, rng=None):
+    # Burst on the block-interleaved stream: rows of `span` bits (one
+    # Hamming(7,4) codeword by default) are sent column by column, so after
+    # deinterleaving a burst no longer than the row count hits each row once.
+    bits = _to_bits(data)
+    depth = max(1, len(bits) // span)
+    noisy = burst_errors(block_interleave(bits, depth, span), burst_length, rng)
+    return _from_bits(block_deinterleave(noisy, depth, span), data)
+
+@profiled()
+def gaussian_flip(data, intensity: float = 0.2, rng=None):
+    # Independent flips with probability `intensity`; see
+    # ecc.channel.bpsk_awgn for an actual Gaussian channel.
+    return _from_bits(binary_symmetric(_to_bits(data), intensity, rng), data)
@@ -0,0 +1,282 @@
+# ecc/pipeline.py
+# Chains of coding stages run as one codec, e.g. the CCSDS-style
+# concatenation of an outer Reed-Solomon code with an inner convolutional
+# code:
+#
+#   bits -> bytes -> RS encode -> byte interleave -> bits -> conv encode
+#        -> channel -> Viterbi -> bits -> bytes -> deinterleave -> RS decode
+#
+# A Pipeline is declared once from its stages and frame size; every stage
+# maps (N, L) batches to (N, L') batches, so a call moves a whole batch of
+# frames through each stage in turn with no per-frame conversions. The byte
+# <-> bit and interleaving stages write into buffers kept between calls, so
+# a pipeline run over many same-sized batches (stream()) stops allocating
+# after the first. The buffers make a Pipeline unsafe to share between
+# threads; build one per worker.
+import numpy as np
+
+from ecc.channel import apply_channel
+from ecc.convolutional import ConvolutionalCode
+from ecc.interleaver import block_permutation
+from ecc.profiling import stage
+from ecc.reed_solomon import codec_pool
+
+# byte -> its 8 bits (MSB first) and bits -> byte weights
+BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1)
+BIT_WEIGHTS = (1 << np.arange(7, -1, -1)).astype(np.uint8)
+for _table in (BYTE_BITS, BIT_WEIGHTS):
+    _table.setflags(write=False)
+
+
+class Stage:
+    """One step of a pipeline. encode() maps an (N, L) batch to
+    (N, encoded_length(L)); decode() maps it back given the length wanted.
+    Stages with soft = True also decode channel LLRs in decode_soft()."""
+
+    name = 'stage'
+    soft = False
+
+    def __init__(self):
+        self._buffers = {}
+
+    def _buffer(self, key, shape, dtype):
+        # reused while the batch shape stays the same
+        buf = self._buffers.get(key)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self._buffers[key] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def owns(self, array):
+        """Whether `array` lives in one of this stage's reused buffers."""
+        return any(np.shares_memory(array, buf) for buf in self._buffers.values())
+
+    def encoded_length(self, length):
+        return length
+
+    def params(self):
+        return {}
+
+
+class BitsToBytes(Stage):
+    """Pack bit frames into bytes (MSB first); the frame must be whole bytes."""
+
+    name = 'bits-to-bytes'
+
+    def encoded_length(self, length):
+        if length % 8:
+            raise ValueError(f"A frame of {length} bits is not a whole number of bytes")
+        return length // 8
+
+    def encode(self, bits):
+        n, length = bits.shape
+        out = self._buffer('encode', (n, length // 8), np.uint8)
+        return np.matmul(bits.reshape(n, -1, 8), BIT_WEIGHTS, out=out)
+
+    def decode(self, data, length):
+        n = len(data)
+        out = self._buffer('decode', (n, data.shape[1], 8), np.uint8)
+        return np.take(BYTE_BITS, data, axis=0, out=out).reshape(n, -1)[:, :length]
+
+
+class BytesToBits(Stage):
+    """Unpack byte frames into bits; the inverse of BitsToBytes."""
+
+    name = 'bytes-to-bits'
+
+    def encoded_length(self, length):
+        return length * 8
+
+    def encode(self, data):
+        n = len(data)
+        out = self._buffer('encode', (n, data.shape[1], 8), np.uint8)
+        return np.take(BYTE_BITS, data, axis=0, out=out).reshape(n, -1)
+
+    def decode(self, bits, length):
+        n = len(bits)
+        out = self._buffer('decode', (n, length), np.uint8)
+        return np.matmul(bits[:, :length * 8].reshape(n, -1, 8), BIT_WEIGHTS, out=out)
+
+
+class RSOuter(Stage):
+    """Reed-Solomon over `codewords` consecutive messages of `data_bytes`
+    bytes per frame. Uncorrectable codewords keep their systematic bytes as
+    received."""
+
+    name = 'rs'
+
+    def __init__(self, nsym=16, data_bytes=223, codewords=1):
+        super().__init__()
+        if not 0 < data_bytes <= 255 - nsym:
+            raise ValueError(f"data_bytes must be between 1 and {255 - nsym}")
+        self.nsym, self.data_bytes, self.codewords = nsym, data_bytes, codewords
+        self.codec = codec_pool.get_batch(nsym)
+
+    def params(self):
+        return {'nsym': self.nsym, 'data_bytes': self.data_bytes, 'codewords': self.codewords}
+
+    def encoded_length(self, length):
+        if length != self.codewords * self.data_bytes:
+            raise ValueError(f"RS stage expects frames of {self.codewords * self.data_bytes} bytes")
+        return self.codewords * (self.data_bytes + self.nsym)
+
+    def encode(self, data):
+        n = len(data)
+        return self.codec.encode(data.reshape(n * self.codewords, -1)).reshape(n, -1)
+
+    def decode(self, data, length):
+        n = len(data)
+        messages, _ = self.codec.decode(data.reshape(n * self.codewords, -1))
+        return messages.reshape(n, -1)
+
+
+class Interleave(Stage):
+    """Block interleaver over each frame (ecc.interleaver.block_interleave).
+    After RSOuter with depth = codewords and span = its codeword length it
+    sends the codewords symbol by symbol, so an inner-decoder error burst of
+    up to `depth` bytes costs each RS codeword one symbol."""
+
+    name = 'interleave'
+    soft = True
+
+    def __init__(self, depth, span):
+        super().__init__()
+        self.depth, self.span = depth, span
+
+    def params(self):
+        return {'depth': self.depth, 'span': self.span}
+
+    def encode(self, data):
+        perm, _ = block_permutation(self.depth, self.span, data.shape[1])
+        out = self._buffer('encode', data.shape, data.dtype)
+        return np.take(data, perm, axis=1, out=out)
+
+    def decode(self, data, length):
+        _, inverse = block_permutation(self.depth, self.span, data.shape[1])
+        out = self._buffer('decode', data.shape, data.dtype)
+        return np.take(data, inverse, axis=1, out=out)
+
+    decode_soft = decode
+
+
+class ConvInner(Stage):
+    """Convolutional code, terminated with K - 1 zero tail bits per frame
+    unless tail=False."""
+
+    name = 'conv'
+    soft = True
+
+    def __init__(self, generators=(0o7, 0o5), constraint_length=3, puncture=None, tail=True):
+        super().__init__()
+        self.code = ConvolutionalCode(generators, constraint_length, puncture)
+        self.puncture = puncture
+        self.tail = self.code.memory if tail else 0
+
+    def params(self):
+        return {'generators': list(self.code.generators),
+                'constraint_length': self.code.constraint_length,
+                'puncture': self.puncture, 'tail': bool(self.tail)}
+
+    def encoded_length(self, length):
+        return self.code.encoded_length(length + self.tail)
+
+    def encode(self, bits):
+        if self.tail:
+            padded = self._buffer('encode', (len(bits), bits.shape[1] + self.tail), np.uint8)
+            padded[:, :bits.shape[1]] = bits
+            padded[:, bits.shape[1]:] = 0
+            bits = padded
+        return self.code.encode(bits)
+
+    def decode(self, received, length):
+        return self.code.decode(received)[:, :length]
+
+    def decode_soft(self, llrs, length):
+        return self.code.decode_soft(llrs)[:, :length]
+
+
+class Pipeline:
+    """Stages applied in order to frames of `data_bits` bits; decoding runs
+    them backwards. decode_soft() takes LLRs and decodes softly up to the
+    first stage that needs hard input."""
+
+    def __init__(self, stages, data_bits):
+        self.stages = list(stages)
+        self.data_bits = data_bits
+        self.lengths = [data_bits]  # frame length entering each stage, then the output
+        for s in self.stages:
+            self.lengths.append(s.encoded_length(self.lengths[-1]))
+        self.code_bits = self.lengths[-1]
+
+    def __repr__(self):
+        return f"Pipeline({' -> '.join(s.name for s in self.stages)}, {self.data_bits}/{self.code_bits})"
+
+    def params(self):
+        return {'data_bits': self.data_bits,
+                'stages': [dict(s.params(), stage=s.name) for s in self.stages]}
+
+    def encode(self, bits):
+        """Encode an (N, data_bits) batch into (N, code_bits)."""
+        x = np.atleast_2d(np.asarray(bits, dtype=np.uint8))
+        for s in self.stages:
+            with stage(f'pipeline.{s.name}.encode', x.size):
+                x = s.encode(x)
+        return x.copy() if self.stages[-1].owns(x) else x
+
+    def decode(self, received, soft=False):
+        """Decode an (N, code_bits) batch (LLRs when soft) into (N, data_bits)."""
+        x = np.atleast_2d(np.asarray(received))
+        for i in range(len(self.stages) - 1, -1, -1):
+            s = self.stages[i]
+            with stage(f'pipeline.{s.name}.decode', x.size):
+                if soft and s.soft:
+                    x = s.decode_soft(x, self.lengths[i])
+                else:
+                    soft = False  # stages before this one get hard bits
+                    x = s.decode(x, self.lengths[i])
+        return x.copy() if self.stages[0].owns(x) else x
+
+    def decode_soft(self, llrs):
+        return self.decode(llrs, soft=True)
+
+    def run(self, bits, channel='bsc', level=0.01, rng=None, soft=False, **channel_params):
+        """Encode, pass through ecc.channel.apply_channel and decode one batch."""
+        encoded = self.encode(bits)
+        received = apply_channel(channel, encoded, level, rng, rate=self.data_bits / self.code_bits,
+                                 soft=soft, **channel_params)
+        return self.decode(received, soft=soft)
+
+    def stream(self, batches, channel='bsc', level=0.01, rng=None, soft=False, **channel_params):
+        """Generator running run() over an iterable of (n, data_bits)
+        batches; same-sized batches reuse every stage buffer."""
+        rng = np.random.default_rng(rng)
+        for bits in batches:
+            yield self.run(bits, channel, level, rng, soft, **channel_params)
+
+    def encode_bytes(self, payload):
+        """Encode a payload of any length, zero-padded to whole frames, into
+        one flat bit array."""
+        frame_bytes = self.data_bits // 8
+        data = np.frombuffer(bytes(payload), dtype=np.uint8)
+        frames = np.zeros((max(1, -(-len(data) // frame_bytes)), frame_bytes), dtype=np.uint8)
+        frames.reshape(-1)[:len(data)] = data
+        return self.encode(np.unpackbits(frames, axis=1)).reshape(-1)
+
+    def decode_bytes(self, received, length):
+        """Inverse of encode_bytes for a payload of `length` bytes."""
+        received = np.asarray(received).reshape(-1, self.code_bits)
+        return np.packbits(self.decode(received)).tobytes()[:length]
+
+
+def concatenated(frame_bits=1024, nsym=16, depth=4, generators=(0o7, 0o5), constraint_length=3,
+                 puncture=None, tail=True):
+    """Outer RS (depth codewords per frame, symbol interleaved) with an
+    inner convolutional code. Each codeword carries frame_bits / 8 / depth
+    message bytes, at most 255 - nsym."""
+    data_bytes = max(1, min(frame_bits // 8 // depth, 255 - nsym))
+    return Pipeline([
+        BitsToBytes(),
+        RSOuter(nsym, data_bytes, depth),
+        Interleave(depth, data_bytes + nsym),
+        BytesToBits(),
+        ConvInner(generators, constraint_length, puncture, tail),
+    ], data_bytes * depth * 8)
@@ -0,0 +1,136 @@
+# ecc/profiling.py
+# Per-stage instrumentation of the codec and noise entry points: call
+# counts, wall time and bits processed. Off unless the ECC_PROFILE
+# environment variable is set (to anything but 0/false/no) or enable() is
+# called; while off a wrapped function costs one flag test before calling
+# straight through. Nested stages are timed inclusively, so conv_encode
+# also shows up under ConvolutionalCode.encode.
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+_enabled = os.environ.get('ECC_PROFILE', '').strip().lower() not in ('', '0', 'false', 'no')
+_lock = threading.Lock()
+_totals = {}     # stage -> [calls, seconds, bits]
+_captures = []   # extra sinks registered by capture()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def bit_count(data):
+    """Bits in a bit string, byte buffer or bit/LLR array."""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data) * 8
+    if isinstance(data, str):
+        return len(data)
+    return getattr(data, 'size', 0)
+
+
+def byte_bits(data):
+    """Bits in text, a byte buffer, a byte array or a BitBuffer."""
+    if isinstance(data, (str, bytes, bytearray, memoryview)):
+        return len(data) * 8
+    return getattr(data, 'nbytes', 0) * 8
+
+
+def _record(name, seconds, bits):
+    with _lock:
+        for sink in [_totals] + _captures:
+            entry = sink.get(name)
+            if entry is None:
+                entry = sink[name] = [0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += bits
+
+
+def profiled(stage=None, arg=0, bits=bit_count):
+    """Decorator recording a stage per call. `bits(args[arg])` gives the
+    bits processed; use arg=1 for methods."""
+    def decorate(fn):
+        name = stage or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            started = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, perf_counter() - started, bits(args[arg]) if len(args) > arg else 0)
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def stage(name, bits=0):
+    """Record the with-block as one call of stage `name`."""
+    if not _enabled:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, perf_counter() - started, bits)
+
+
+@contextmanager
+def capture():
+    """Collect only the stages recorded inside the with-block (from any
+    thread); the yielded dict is filled in as they complete."""
+    sink = {}
+    with _lock:
+        _captures.append(sink)
+    try:
+        yield sink
+    finally:
+        with _lock:
+            _captures.remove(sink)
+
+
+def report(totals=None):
+    """{stage: {'calls', 'seconds', 'bits', 'bits_per_s'}}, slowest first."""
+    if totals is None:
+        with _lock:
+            totals = {name: list(entry) for name, entry in _totals.items()}
+    rows = sorted(totals.items(), key=lambda item: -item[1][1])
+    return {
+        name: {
+            'calls': calls,
+            'seconds': seconds,
+            'bits': bits,
+            'bits_per_s': bits / seconds if seconds else 0.0,
+        }
+        for name, (calls, seconds, bits) in rows
+    }
+
+
+def format_report(totals=None):
+    rows = report(totals)
+    if not rows:
+        return "No profiled stages recorded."
+    lines = [f"{'stage':<32}{'calls':>8}{'ms':>11}{'Mbit/s':>10}"]
+    for name, r in rows.items():
+        lines.append(f"{name:<32}{r['calls']:>8}{r['seconds'] * 1e3:>11.3f}{r['bits_per_s'] / 1e6:>10.3f}")
+    return '\n'.join(lines)
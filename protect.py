@@ -0,0 +1,144 @@
+# ecc/protect.py
+# Command-line protection of files or stdin with the framed container:
+#
+#   python -m ecc.protect encode archive.tar archive.ecc --codec rs --nsym 16
+#   python -m ecc.protect decode archive.ecc archive.tar --report report.json
+#
+# Input files are memory-mapped and every stage is a generator, so memory
+# use does not grow with the file size. The codecs are imported on first use
+# so building the argument parser (and --help) stays cheap.
+import argparse
+import json
+import mmap
+import sys
+from collections import Counter
+from contextlib import contextmanager
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+@contextmanager
+def open_input(path):
+    """Readable source with read(n): stdin, an mmap, or an empty file."""
+    if path == '-':
+        yield sys.stdin.buffer
+        return
+    with open(path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty files cannot be mapped
+            yield f
+            return
+        with mapped:
+            yield mapped
+
+
+@contextmanager
+def open_output(path):
+    if path == '-':
+        yield sys.stdout.buffer
+        sys.stdout.buffer.flush()
+        return
+    with open(path, 'wb') as f:
+        yield f
+
+
+def read_chunks(source, size):
+    while True:
+        chunk = source.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def encode_file(src, dst, codec, block_size=DEFAULT_BLOCK_SIZE):
+    from ecc.container import encode_stream
+    with open_input(src) as source, open_output(dst) as sink:
+        for piece in encode_stream(read_chunks(source, block_size), codec, block_size):
+            sink.write(piece)
+
+
+def decode_file(src, dst):
+    """Decode a container and return the list of FrameReports."""
+    from ecc.container import decode_stream
+    reports = []
+    with open_input(src) as source, open_output(dst) as sink:
+        for payload, report in decode_stream(source):
+            sink.write(payload)
+            reports.append(report)
+    return reports
+
+
+def summarize(reports):
+    counts = Counter(r.status for r in reports)
+    return {
+        'frames': len(reports) - counts['truncated'],
+        'ok': counts['ok'],
+        'corrected': [r.seq for r in reports if r.status == 'corrected'],
+        'uncorrectable': [r.seq for r in reports if r.status == 'uncorrectable'],
+        'lost': [r.seq for r in reports if r.status == 'lost'],
+        # first frame missing from a stream cut before its trailer, or None
+        'truncated': next((r.seq for r in reports if r.status == 'truncated'), None),
+        'symbols_corrected': sum(r.corrected for r in reports),
+    }
+
+
+def codec_from_args(args):
+    from ecc.container import make_byte_codec
+    if args.codec == 'rs':
+        return make_byte_codec('rs', nsym=args.nsym, chunk_size=args.chunk_size)
+    if args.codec == 'conv':
+        generators = tuple(int(g, 8) for g in args.generators.split(','))
+        return make_byte_codec('conv', generators=generators, constraint_length=args.constraint_length,
+                               puncture=args.puncture, block_bits=args.block_bits)
+    from ecc.hamming import NAMED_CODES
+    m, extended, data_bits = NAMED_CODES[args.hamming_code]
+    return make_byte_codec('hamming', m=m, extended=extended, data_bits=data_bits)
+
+
+def add_arguments(subparsers):
+    enc = subparsers.add_parser('encode', help="protect a file or stdin ('-')")
+    enc.add_argument('input')
+    enc.add_argument('output')
+    enc.add_argument('--codec', choices=['rs', 'conv', 'hamming'], default='rs')
+    enc.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                     help='payload bytes per frame')
+    enc.add_argument('--nsym', type=int, default=10, help='RS parity bytes per chunk')
+    enc.add_argument('--chunk-size', type=int, default=None, help='RS message bytes per chunk')
+    enc.add_argument('--generators', default='7,5', help='octal conv generators, comma separated')
+    enc.add_argument('--constraint-length', type=int, default=3)
+    enc.add_argument('--puncture', choices=['2/3', '3/4'], default=None)
+    enc.add_argument('--block-bits', type=int, default=8192, help='conv input bits per terminated block')
+    enc.add_argument('--hamming-code', choices=['7,4', '15,11', '31,26', '8,4', '16,11', '39,32', '72,64'],
+                     default='7,4', help='Hamming (n,k); the even-n codes are SECDED')
+
+    dec = subparsers.add_parser('decode', help='recover a protected file')
+    dec.add_argument('input')
+    dec.add_argument('output')
+    dec.add_argument('--report', default=None, help="write the corruption report here ('-' for stderr)")
+
+
+def run(args):
+    if args.command == 'encode':
+        encode_file(args.input, args.output, codec_from_args(args), args.block_size)
+        return 0
+    summary = summarize(decode_file(args.input, args.output))
+    if args.report == '-':
+        json.dump(summary, sys.stderr, indent=2)
+        sys.stderr.write('\n')
+    elif args.report:
+        with open(args.report, 'w') as f:
+            json.dump(summary, f, indent=2)
+    damaged = summary['uncorrectable'] or summary['lost'] or summary['truncated'] is not None
+    return 1 if damaged else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m ecc.protect',
+                                     description='Protect files with error-correcting codes.')
+    add_arguments(parser.add_subparsers(dest='command', required=True))
+    return run(parser.parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
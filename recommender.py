@@ -0,0 +1,261 @@
+# ecc/recommender.py
+# Picks the codec configuration for a link from measured performance:
+#
+#   with ResultStore() as store:
+#       best = Recommender(store).recommend(burst_channel(1e-3, mean_burst=4),
+#                                           Constraints(max_ber=1e-6, max_overhead=1.0))
+#
+# Every candidate configuration is checked against the constraints on
+# overhead, speed (encode + decode throughput and single-frame latency,
+# measured once per configuration) and reliability on the channel (BER/FER
+# from a Monte Carlo simulation of that exact point). Speeds and simulated
+# points are kept in a ResultStore, so a channel seen before is answered
+# from the tables; otherwise a micro-simulation within the time budget
+# adds the frames still needed. Of the configurations meeting everything,
+# the one delivering the most data wins.
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from ecc.frame_codecs import make_codec
+from ecc.hamming import NAMED_CODES
+from ecc.simulation import SweepPoint, resolve, sweep
+
+Channel = namedtuple('Channel', ['model', 'level', 'params'], defaults=({},))
+
+# Requirements on a configuration; None leaves one out. max_overhead is
+# parity bits per data bit, throughput and link_rate are in bits/s and
+# max_latency in seconds to encode and decode one frame.
+Constraints = namedtuple(
+    'Constraints',
+    ['max_ber', 'max_fer', 'max_overhead', 'max_latency', 'min_throughput', 'link_rate'],
+    defaults=(1e-5, None, None, None, None, None),
+)
+
+Evaluation = namedtuple('Evaluation', [
+    'codec', 'codec_params', 'rate', 'throughput', 'latency',
+    'ber', 'ber_high', 'fer', 'fer_high', 'frames', 'goodput', 'status', 'reason',
+])
+
+# status of an Evaluation, best first
+VERIFIED = 'verified'      # reliability confirmed (upper confidence bound within target)
+LIKELY = 'likely'          # measured rates within target, too few frames to confirm
+FAILED = 'failed'          # measured rates above target
+EXCLUDED = 'excluded'      # overhead, latency or throughput out of bounds
+STATUS_ORDER = (VERIFIED, LIKELY, FAILED, EXCLUDED)
+
+DEFAULT_CANDIDATES = (
+    [('hamming', dict(zip(('m', 'extended', 'block_bits'), NAMED_CODES[name])))
+     for name in ('7,4', '15,11', '39,32', '72,64')]
+    + [('convolutional', {}),
+       ('convolutional', {'puncture': '2/3'}),
+       ('convolutional', {'puncture': '3/4'}),
+       ('convolutional', {'generators': [0o171, 0o133], 'constraint_length': 7})]
+    + [('reed-solomon', {'nsym': nsym}) for nsym in (4, 10, 16, 32)]
+    + [('concatenated', {})]
+)
+
+DEFAULT_TIME_BUDGET = 5.0  # seconds of simulation per recommendation
+MAX_FRAMES = 1_000_000
+MIN_POINT_TIME = 0.05  # seconds every simulated candidate gets, whatever the budget
+SPEED_BATCH = 64
+SPEED_MIN_TIME = 0.05
+
+
+def burst_channel(error_rate, mean_burst=1.0):
+    """Channel with the given average bit error rate whose errors come in
+    bursts of `mean_burst` bits on average: a binary symmetric channel for
+    independent errors, otherwise a Gilbert-Elliott channel whose bad state
+    (error rate 1/2) lasts mean_burst * 2 bits on average."""
+    if not 0 <= error_rate < 0.5:
+        raise ValueError("error_rate must be in [0, 0.5)")
+    if mean_burst <= 1:
+        return Channel('bsc', error_rate)
+    p_bad_good = 1 / (2 * mean_burst)
+    bad = 2 * error_rate  # share of time in the bad state
+    return Channel('gilbert-elliott', bad * p_bad_good / (1 - bad), {'p_bad_good': p_bad_good})
+
+
+def frames_to_confirm(rate, data_bits, per_frame=False):
+    """Error-free frames after which the upper 95% Wilson bound of an error
+    rate drops to `rate` (z^2 / n < rate)."""
+    trials = math.ceil(1.96 ** 2 / rate)
+    return trials if per_frame else -(-trials // data_bits)
+
+
+def measure_speed(codec, batch=SPEED_BATCH, min_time=SPEED_MIN_TIME):
+    """(throughput, latency) of a frame codec: data bits per second encoding
+    and decoding `batch` frames at once, and seconds for a single frame."""
+    from ecc.benchmark import measure
+
+    rng = np.random.default_rng(0)
+    frames = rng.integers(0, 2, (batch, codec.data_bits), dtype=np.uint8)
+    encoded = codec.encode(frames)
+    single, single_encoded = frames[:1], encoded[:1]
+
+    def batch_run():
+        codec.encode(frames)
+        codec.decode(encoded)
+
+    def single_run():
+        codec.encode(single)
+        codec.decode(single_encoded)
+
+    batch_run()  # builds tables and codec caches outside the timing
+    seconds, _ = measure(batch_run, min_time)
+    latency, _ = measure(single_run, min_time)
+    return batch * codec.data_bits / seconds, latency
+
+
+class Recommender:
+    """Evaluates candidate (codec, params) configurations on frames of
+    frame_bits data bits. With a store (ecc.result_store.ResultStore),
+    speeds and simulated points are reused and kept for later calls."""
+
+    def __init__(self, store=None, candidates=DEFAULT_CANDIDATES, frame_bits=1024, seed=0,
+                 max_frames=MAX_FRAMES):
+        self.store = store
+        self.candidates = list(candidates)
+        self.frame_bits = frame_bits
+        self.seed = seed
+        self.max_frames = max_frames
+        self._speeds = {}
+
+    def speed(self, codec_name, codec):
+        params = codec.params()
+        config = {'codec': codec_name, 'codec_params': params}
+        key = (codec_name, repr(sorted(params.items())))
+        if key not in self._speeds:
+            speed = self.store.get_speed(config) if self.store is not None else None
+            if speed is None:
+                speed = measure_speed(codec)
+                if self.store is not None:
+                    self.store.set_speed(config, *speed)
+            self._speeds[key] = speed
+        return self._speeds[key]
+
+    def _frames_needed(self, codec, constraints):
+        needed = [1]
+        if constraints.max_ber:
+            needed.append(frames_to_confirm(constraints.max_ber, codec.data_bits))
+        if constraints.max_fer:
+            needed.append(frames_to_confirm(constraints.max_fer, 1, per_frame=True))
+        return min(max(needed), self.max_frames)
+
+    def evaluate(self, channel, constraints=Constraints(), time_budget=DEFAULT_TIME_BUDGET,
+                 progress=None):
+        """Evaluations of every candidate, best first.
+
+        Candidates meeting the overhead and speed constraints are simulated
+        on the channel until their reliability is confirmed, clearly missed
+        (100 frame errors) or their share of time_budget runs out; points
+        already in the store only simulate the frames they still lack.
+        progress(done, total) is called after each candidate.
+        """
+        started = time.perf_counter()
+        evaluations = []
+        pending = []  # (evaluation, point, frames needed)
+        for i, (name, params) in enumerate(self.candidates):
+            codec = make_codec(name, **dict(params, frame_bits=self.frame_bits))
+            rate = codec.data_bits / codec.code_bits
+            throughput, latency = self.speed(name, codec)
+            evaluation = Evaluation(name, codec.params(), rate, throughput, latency,
+                                    None, None, None, None, 0, 0.0, EXCLUDED, '')
+            reason = _excluded(constraints, rate, throughput, latency)
+            if reason:
+                evaluations.append(evaluation._replace(reason=reason))
+            else:
+                point = resolve(SweepPoint(name, dict(params, frame_bits=self.frame_bits), channel.model,
+                                           channel.params, channel.level, channel.model == 'awgn'))
+                pending.append((evaluation, point, self._frames_needed(codec, constraints)))
+            if progress:
+                progress(i + 1, len(self.candidates) + len(pending))
+
+        for j, (evaluation, point, frames) in enumerate(pending):
+            remaining = time_budget - (time.perf_counter() - started)
+            share = max(remaining / (len(pending) - j), MIN_POINT_TIME)
+            # batches small enough for the time budget to be checked a few times
+            per_second = evaluation.throughput / point.codec_params['frame_bits']
+            batch = int(min(max(per_second * share / 8, 1), 64))
+            result, = sweep([point], seed=self.seed, workers=1, store=self.store,
+                            max_frames=frames, max_frame_errors=100, time_budget=share,
+                            batch_frames=batch)
+            evaluations.append(_judge(evaluation, result, constraints))
+            if progress:
+                progress(len(self.candidates) + j + 1, len(self.candidates) + len(pending))
+
+        return sorted(evaluations, key=lambda e: (STATUS_ORDER.index(e.status), -e.goodput,
+                                                  -e.throughput))
+
+    def recommend(self, channel, constraints=Constraints(), time_budget=DEFAULT_TIME_BUDGET,
+                  progress=None):
+        """The best verified (or else likely) evaluation, None if no
+        candidate meets the constraints."""
+        best = self.evaluate(channel, constraints, time_budget, progress)[0]
+        return best if best.status in (VERIFIED, LIKELY) else None
+
+
+def _excluded(constraints, rate, throughput, latency):
+    # the constraint a configuration misses before any simulation, or ''
+    if constraints.max_overhead is not None and 1 / rate - 1 > constraints.max_overhead + 1e-9:
+        return f"overhead {1 / rate - 1:.2f} > {constraints.max_overhead}"
+    if constraints.max_latency is not None and latency > constraints.max_latency:
+        return f"latency {latency * 1e3:.3g} ms > {constraints.max_latency * 1e3:.3g} ms"
+    if constraints.min_throughput is not None and throughput < constraints.min_throughput:
+        return f"throughput {throughput / 1e6:.3g} Mbit/s < {constraints.min_throughput / 1e6:.3g} Mbit/s"
+    return ''
+
+
+def _judge(evaluation, result, constraints):
+    ber_low, ber_high = result['ber_ci']
+    fer_low, fer_high = result['fer_ci']
+    targets = [(result['ber'], ber_low, ber_high, constraints.max_ber, 'BER'),
+               (result['fer'], fer_low, fer_high, constraints.max_fer, 'FER')]
+    status, reason = VERIFIED, 'reliability confirmed'
+    for value, low, high, target, label in targets:
+        if target is None:
+            continue
+        if value > target:
+            status, reason = FAILED, f"{label} {value:.3g} > {target:.3g}"
+            break
+        if high > target:
+            status = LIKELY
+            reason = f"{label} {value:.3g} within target, bound {high:.3g} after {result['frames']} frames"
+
+    # data bits delivered: per channel bit, or per second on a link of link_rate bits/s
+    goodput = evaluation.rate * (1 - result['fer'])
+    if constraints.link_rate:
+        goodput = min(constraints.link_rate * evaluation.rate, evaluation.throughput) * (1 - result['fer'])
+    return evaluation._replace(ber=result['ber'], ber_high=ber_high, fer=result['fer'], fer_high=fer_high,
+                               frames=result['frames'], goodput=goodput, status=status, reason=reason)
+
+
+def _label(evaluation):
+    # codec and the parameters differing from its defaults, generators in octal
+    params = evaluation.codec_params
+    defaults = make_codec(evaluation.codec, frame_bits=params['frame_bits']).params()
+    shown = []
+    for key, value in params.items():
+        if key == 'frame_bits' or value == defaults.get(key):
+            continue
+        if key == 'generators':
+            value = '(' + ','.join(f'{g:#o}' for g in value) + ')'
+        shown.append(f'{key}={value}')
+    return f"{evaluation.codec}:{','.join(shown)}" if shown else evaluation.codec
+
+
+def format_table(evaluations):
+    labels = [_label(e) for e in evaluations]
+    width = max(map(len, labels + ['codec']))
+    lines = [f"{'codec':<{width}} {'rate':>5} {'Mbit/s':>8} {'lat ms':>7} {'BER':>9} {'FER':>9} "
+             f"{'frames':>8} {'goodput':>9}  status"]
+    for label, e in zip(labels, evaluations):
+        def rate(value):
+            return f"{value:9.2e}" if value is not None else f"{'-':>9}"
+
+        lines.append(f"{label:<{width}} {e.rate:5.3f} {e.throughput / 1e6:8.2f} {e.latency * 1e3:7.3f} "
+                     f"{rate(e.ber)} {rate(e.fer)} {e.frames:8d} {e.goodput:9.3g}  {e.status}"
+                     + (f" ({e.reason})" if e.reason else ''))
+    return '\n'.join(lines)
@@ -1,14 +1,172 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import reedsolo
 
-rs = reedsolo.RSCodec(10)
+from ecc.bitbuffer import BitBuffer
+from ecc.rs_batch import RSBatchCodec
+from ecc.profiling import byte_bits, profiled
+
+
+class RSCodecPool:
+    """LRU cache of codecs keyed by (nsym, nsize, fcr, prim).
+
+    Building a codec computes its field tables and generator polynomial, so
+    callers mixing redundancy levels should fetch codecs from here rather
+    than constructing them per call.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._codecs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, kind, key, factory):
+        with self._lock:
+            codec = self._codecs.get((kind, key))
+            if codec is not None:
+                self._codecs.move_to_end((kind, key))
+                return codec
+        codec = factory(*key)
+        with self._lock:
+            codec = self._codecs.setdefault((kind, key), codec)
+            while len(self._codecs) > self.maxsize:
+                self._codecs.popitem(last=False)
+        return codec
+
+    def get(self, nsym=10, nsize=255, fcr=0, prim=0x11d):
+        """reedsolo.RSCodec for these parameters."""
+        return self._get('reedsolo', (nsym, nsize, fcr, prim), reedsolo.RSCodec)
+
+    def get_batch(self, nsym=10, nsize=255, fcr=0, prim=0x11d):
+        """Vectorized RSBatchCodec for these parameters."""
+        return self._get('batch', (nsym, nsize, fcr, prim), RSBatchCodec)
 
-def rs_encode(data: str):
-    encoded = rs.encode(data.encode())
+    def clear(self):
+        with self._lock:
+            self._codecs.clear()
+
+    def __len__(self):
+        return len(self._codecs)
+
+
+codec_pool = RSCodecPool()
+
+
+# rs_encode/rs_decode take text and return text; given a BitBuffer (whole
+# bytes) they work on its bytes and return BitBuffers.
+
+@profiled(bits=byte_bits)
+def rs_encode(data: str, nsym=10):
+    if isinstance(data, BitBuffer):
+        return BitBuffer(codec_pool.get(nsym).encode(bytes(data)))
+    encoded = codec_pool.get(nsym).encode(data.encode())
     return encoded
 
-def rs_decode(encoded: bytes):
+@profiled(bits=byte_bits)
+def rs_decode(encoded: bytes, nsym=10, erase_pos=None):
     try:
-        decoded = rs.decode(encoded)[0]
+        if isinstance(encoded, BitBuffer):
+            return BitBuffer(codec_pool.get(nsym).decode(bytes(encoded), erase_pos=erase_pos)[0]), None
+        decoded = codec_pool.get(nsym).decode(encoded, erase_pos=erase_pos)[0]
         return decoded.decode(), None
     except reedsolo.ReedSolomonError as e:
         return None, str(e)
+
+@profiled(bits=byte_bits)
+def rs_encode_batch(messages, nsym=10):
+    # (N, k) byte matrix -> (N, k + nsym) codewords, same bytes as rs_encode
+    return codec_pool.get_batch(nsym).encode(messages)
+
+@profiled(bits=byte_bits)
+def rs_decode_batch(codewords, nsym=10):
+    # -> (N, k) messages and per-row corrected byte count (-1: uncorrectable)
+    return codec_pool.get_batch(nsym).decode(codewords)
+
+
+@profiled(bits=byte_bits)
+def rs_encode_chunked(payload: bytes, nsym=10, chunk_size=None, nsize=255, fcr=0, prim=0x11d):
+    """Encode a payload of any length as consecutive RS codewords.
+
+    Each chunk of `chunk_size` message bytes (default nsize - nsym, the
+    largest that fits) is followed by its nsym parity bytes; the last chunk
+    may be shorter. With the default chunk size the output is the same as
+    reedsolo's implicit chunking. Full chunks are encoded in one batch.
+    A BitBuffer payload gives a BitBuffer back.
+    """
+    chunk_size = chunk_size or nsize - nsym
+    if not 0 < chunk_size <= nsize - nsym:
+        raise ValueError(f"Chunk size must be between 1 and {nsize - nsym}")
+    codec = codec_pool.get_batch(nsym, nsize, fcr, prim)
+    data = np.frombuffer(bytes(payload), dtype=np.uint8)
+    full = len(data) // chunk_size * chunk_size
+    encoded = codec.encode(data[:full].reshape(-1, chunk_size)).tobytes() if full else b''
+    if full < len(data):
+        encoded += codec.encode(data[full:]).tobytes()
+    return BitBuffer(encoded) if isinstance(payload, BitBuffer) else encoded
+
+
+def _decode_chunked(encoded, nsym, chunk_size, erase_pos, nsize, fcr, prim):
+    # -> (payload bytes, failed chunk indices, corrected byte count)
+    chunk_size = chunk_size or nsize - nsym
+    block = chunk_size + nsym
+    batch = codec_pool.get_batch(nsym, nsize, fcr, prim)
+    data = np.frombuffer(bytes(encoded), dtype=np.uint8)
+    n_full = len(data) // block
+    blocks = data[:n_full * block].reshape(n_full, block)
+    tail = data[n_full * block:]
+
+    erasures = {}
+    for pos in erase_pos or ():
+        erasures.setdefault(pos // block, []).append(pos % block)
+
+    # Clean full chunks are recognised by one batched syndrome check and
+    # dirty ones corrected natively; only chunks with erasures need reedsolo.
+    messages, status = batch.decode(blocks)
+    corrected = dict(enumerate(status.tolist()))
+    tail_message = b''
+    if len(tail):
+        fixed, tail_status = batch.decode(tail)
+        tail_message = fixed[0].tobytes()
+        corrected[n_full] = int(tail_status[0])
+
+    if erasures:
+        codec = codec_pool.get(nsym, nsize, fcr, prim)
+        for index, positions in erasures.items():
+            chunk = blocks[index] if index < n_full else tail
+            try:
+                fixed, _, errata = codec.decode(chunk.tobytes(), erase_pos=positions)
+            except reedsolo.ReedSolomonError:
+                corrected[index] = -1
+                continue
+            corrected[index] = len(errata)
+            if index < n_full:
+                messages[index] = np.frombuffer(bytes(fixed), dtype=np.uint8)
+            else:
+                tail_message = bytes(fixed)
+    failed = sorted(index for index, count in corrected.items() if count < 0)
+    return messages.tobytes() + tail_message, failed, sum(c for c in corrected.values() if c > 0)
+
+
+@profiled(bits=byte_bits)
+def rs_decode_chunked(encoded: bytes, nsym=10, chunk_size=None, erase_pos=None,
+                      nsize=255, fcr=0, prim=0x11d):
+    """Decode the output of rs_encode_chunked.
+
+    erase_pos lists byte offsets into `encoded` known to be bad; each costs
+    one parity byte to repair instead of two. Returns the payload and the
+    indices of chunks that could not be corrected (their message bytes are
+    passed through as received).
+    """
+    decoded, failed, _ = _decode_chunked(encoded, nsym, chunk_size, erase_pos, nsize, fcr, prim)
+    return BitBuffer(decoded) if isinstance(encoded, BitBuffer) else decoded, failed
+
+
+@profiled(bits=byte_bits)
+def rs_correct_chunked(encoded: bytes, nsym=10, chunk_size=None, erase_pos=None,
+                       nsize=255, fcr=0, prim=0x11d):
+    """rs_decode_chunked, also returning the number of bytes the decoder
+    corrected in the chunks it could repair: (payload, failed, corrected)."""
+    decoded, failed, corrected = _decode_chunked(encoded, nsym, chunk_size, erase_pos, nsize, fcr, prim)
+    return BitBuffer(decoded) if isinstance(encoded, BitBuffer) else decoded, failed, corrected
@@ -0,0 +1,158 @@
+# ecc/result_store.py
+# SQLite store of simulated sweep points, so reruns and overlapping grids
+# reuse what has already been simulated:
+#
+#   with ResultStore('results.sqlite') as store:
+#       results = sweep(points, seed=0, store=store, max_frames=10**6)
+#
+# A row is keyed by the point's configuration (codec with its full
+# parameters, channel, channel parameters, level, soft) and the sweep seed,
+# and holds the summed counts of every run of that point. Extending a point
+# adds another run's counts to the row. Each row records the version of its
+# frame codec (the `version` attribute of the classes in
+# ecc.frame_codecs); rows written by another version are evicted when the
+# store is opened, so a changed codec never serves stale numbers.
+#
+# A second table keeps measured codec speed (encode + decode throughput
+# and single-frame latency) per codec configuration, for ecc.recommender;
+# it is versioned and evicted the same way.
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+SCHEMA_VERSION = 1
+DEFAULT_PATH = os.path.join('~', '.cache', 'ecc', 'results.sqlite')
+
+COUNT_FIELDS = ('frames', 'bits', 'frame_errors', 'bit_errors', 'seconds')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    key           TEXT PRIMARY KEY,
+    config        TEXT NOT NULL,
+    seed          TEXT NOT NULL,
+    codec         TEXT NOT NULL,
+    codec_version INTEGER NOT NULL,
+    runs          INTEGER NOT NULL,
+    frames        INTEGER NOT NULL,
+    bits          INTEGER NOT NULL,
+    frame_errors  INTEGER NOT NULL,
+    bit_errors    INTEGER NOT NULL,
+    seconds       REAL NOT NULL,
+    updated       REAL NOT NULL
+)
+"""
+
+_SPEED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS speeds (
+    key           TEXT PRIMARY KEY,
+    config        TEXT NOT NULL,
+    codec         TEXT NOT NULL,
+    codec_version INTEGER NOT NULL,
+    throughput    REAL NOT NULL,
+    latency       REAL NOT NULL,
+    updated       REAL NOT NULL
+)
+"""
+
+
+def config_json(config):
+    """Canonical JSON of a point configuration (a dict)."""
+    return json.dumps(config, sort_keys=True, separators=(',', ':'))
+
+
+def codec_versions():
+    from ecc.frame_codecs import CODECS
+    return {name: cls.version for name, cls in CODECS.items()}
+
+
+class ResultStore:
+    def __init__(self, path=DEFAULT_PATH, versions=None):
+        path = os.path.expanduser(path)
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.versions = codec_versions() if versions is None else dict(versions)
+        self._db = sqlite3.connect(path, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        with self._db:
+            if self._db.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+                self._db.execute('DROP TABLE IF EXISTS points')
+                self._db.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self._db.execute(_SCHEMA)
+            self._db.execute(_SPEED_SCHEMA)
+        self.evict_stale()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM points').fetchone()[0]
+
+    @staticmethod
+    def key(config, seed):
+        return hashlib.sha256(f'{config_json(config)}|{seed}'.encode()).hexdigest()
+
+    def get(self, config, seed):
+        """Stored counts of a point as a dict (the configuration, runs and
+        COUNT_FIELDS), or None if it has not been simulated."""
+        row = self._db.execute('SELECT * FROM points WHERE key = ?',
+                               (self.key(config, seed),)).fetchone()
+        if row is None or row['codec_version'] != self.versions.get(row['codec']):
+            return None
+        return dict(json.loads(row['config']), runs=row['runs'],
+                    **{field: row[field] for field in COUNT_FIELDS})
+
+    def add(self, config, seed, counts):
+        """Add one run's counts to a point and return its new totals."""
+        with self._db:
+            self._db.execute(
+                'INSERT INTO points VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET runs = runs + 1, '
+                + ', '.join(f'{f} = {f} + excluded.{f}' for f in COUNT_FIELDS)
+                + ', updated = excluded.updated',
+                (self.key(config, seed), config_json(config), str(seed), config['codec'],
+                 self.versions.get(config['codec'], 0), *(counts[f] for f in COUNT_FIELDS),
+                 time.time()))
+        return self.get(config, seed)
+
+    def get_speed(self, config):
+        """Measured (throughput in data bits/s, latency in seconds) of a
+        codec configuration ({'codec': ..., 'codec_params': ...}), or None."""
+        row = self._db.execute('SELECT * FROM speeds WHERE key = ?',
+                               (self.key(config, ''),)).fetchone()
+        if row is None or row['codec_version'] != self.versions.get(row['codec']):
+            return None
+        return row['throughput'], row['latency']
+
+    def set_speed(self, config, throughput, latency):
+        with self._db:
+            self._db.execute(
+                'INSERT OR REPLACE INTO speeds VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (self.key(config, ''), config_json(config), config['codec'],
+                 self.versions.get(config['codec'], 0), throughput, latency, time.time()))
+
+    def evict_stale(self):
+        """Delete points and speeds measured with another version of their
+        codec (or a codec that no longer exists); returns how many were
+        removed."""
+        removed = 0
+        for table in ('points', 'speeds'):
+            stale = [row['key'] for row in self._db.execute(f'SELECT key, codec, codec_version FROM {table}')
+                     if row['codec_version'] != self.versions.get(row['codec'])]
+            with self._db:
+                self._db.executemany(f'DELETE FROM {table} WHERE key = ?', [(key,) for key in stale])
+            removed += len(stale)
+        return removed
+
+    def clear(self):
+        with self._db:
+            self._db.execute('DELETE FROM points')
+            self._db.execute('DELETE FROM speeds')
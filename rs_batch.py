@@ -0,0 +1,223 @@
+# ecc/rs_batch.py
+# Vectorized GF(256) Reed-Solomon engine for batches of codewords. Field and
+# code conventions follow reedsolo (primitive polynomial 0x11d, generator 2,
+# first consecutive root fcr) so encoded bytes are identical to
+# reedsolo.RSCodec output for the same parameters.
+from functools import lru_cache
+
+import numpy as np
+
+from ecc.profiling import byte_bits, profiled
+
+_SYNDROME_CHUNK = 1024  # codewords per syndrome broadcast
+
+
+@lru_cache(maxsize=None)
+def gf_tables(prim=0x11d, generator=2):
+    """Antilog (doubled, so exponents need no wrap) and log tables."""
+    exp = np.zeros(512, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    x = 1
+    for i in range(255):
+        exp[i] = x
+        log[x] = i
+        # multiply by the generator with carry-less arithmetic
+        product, a, b = 0, x, generator
+        while b:
+            if b & 1:
+                product ^= a
+            a <<= 1
+            if a & 0x100:
+                a ^= prim
+            b >>= 1
+        x = product
+    exp[255:510] = exp[:255]
+    for table in (exp, log):
+        table.setflags(write=False)
+    return exp, log
+
+
+@lru_cache(maxsize=None)
+def gf_mul_table(prim=0x11d, generator=2):
+    """Full 256 x 256 multiplication table."""
+    exp, log = gf_tables(prim, generator)
+    table = exp[log[:, None] + log[None, :]].astype(np.uint8)
+    table[0, :] = 0
+    table[:, 0] = 0
+    table.setflags(write=False)
+    return table
+
+
+class RSBatchCodec:
+    """Systematic RS(n, n - nsym) encoder/decoder over (N, k) byte matrices.
+
+    Messages may be shortened (k < nsize - nsym); every row of a batch must
+    have the same length.
+    """
+
+    def __init__(self, nsym=10, nsize=255, fcr=0, prim=0x11d, generator=2):
+        if not 0 < nsym < nsize <= 255:
+            raise ValueError("Need 0 < nsym < nsize <= 255")
+        self.nsym = nsym
+        self.nsize = nsize
+        self.fcr = fcr
+        self.prim = prim
+        self.generator = generator
+        self.exp, self.log = gf_tables(prim, generator)
+        self.mul = gf_mul_table(prim, generator)
+
+        # generator polynomial, highest degree first: prod (x - a^(i + fcr))
+        gen = np.array([1], dtype=np.uint8)
+        for i in range(nsym):
+            root = self.exp[(i + fcr) % 255]
+            shifted = np.append(gen, 0)
+            shifted[1:] ^= self.mul[root, gen]
+            gen = shifted
+        self.gen = gen
+        self._feedback = self.mul[:, gen[1:]]  # (feedback byte, register tap)
+        self._syndrome_tables = {}
+
+    @property
+    def max_message(self):
+        return self.nsize - self.nsym
+
+    @profiled(arg=1, bits=byte_bits)
+    def encode(self, messages):
+        """Append nsym parity bytes to every row of an (N, k) byte matrix."""
+        messages = np.atleast_2d(np.asarray(messages, dtype=np.uint8))
+        n_rows, k = messages.shape
+        if k > self.max_message:
+            raise ValueError(f"Message of {k} bytes exceeds {self.max_message}")
+        # LFSR division by the generator, one message byte per step for all
+        # rows at once; the register ends up holding the remainder.
+        register = np.zeros((n_rows, self.nsym), dtype=np.uint8)
+        for j in range(k):
+            feedback = messages[:, j] ^ register[:, 0]
+            register[:, :-1] = register[:, 1:]
+            register[:, -1] = 0
+            register ^= self._feedback[feedback]
+        return np.hstack([messages, register])
+
+    def _syndrome_table(self, n):
+        # table[j, v] = syndrome contribution of byte v at position j of an
+        # n-byte codeword, S_i = v * a^((i + fcr) * (n - 1 - j)), packed
+        # into uint64 words so a batch reduces with few wide XORs.
+        if n not in self._syndrome_tables:
+            powers = ((np.arange(self.nsym) + self.fcr)[None, :]
+                      * np.arange(n - 1, -1, -1)[:, None]) % 255
+            width = -(-self.nsym // 8) * 8
+            table = np.zeros((n, 256, width), dtype=np.uint8)
+            table[:, 1:, :self.nsym] = self.exp[self.log[1:][None, :, None] + powers[:, None, :]]
+            self._syndrome_tables[n] = table.view(np.uint64)
+        return self._syndrome_tables[n]
+
+    def syndromes(self, codewords):
+        """(N, nsym) syndromes; a row is error-free iff all are zero."""
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        n_rows, n = codewords.shape
+        table = self._syndrome_table(n)
+        flat = table.reshape(n * 256, -1)
+        offsets = np.arange(n) * 256
+        packed = np.empty((n_rows, table.shape[2]), dtype=np.uint64)
+        for start in range(0, n_rows, _SYNDROME_CHUNK):
+            rows = np.take(flat, codewords[start:start + _SYNDROME_CHUNK] + offsets, axis=0)
+            packed[start:start + _SYNDROME_CHUNK] = np.bitwise_xor.reduce(rows, axis=1)
+        return packed.view(np.uint8)[:, :self.nsym]
+
+    @profiled(arg=1, bits=byte_bits)
+    def decode(self, codewords):
+        """Correct an (N, n) batch of codewords.
+
+        Returns the (N, n - nsym) messages and an (N,) status holding the
+        number of corrected bytes, or -1 where the row was uncorrectable (its
+        message bytes are then returned as received). Only rows with nonzero
+        syndromes go through Berlekamp-Massey/Chien/Forney.
+        """
+        codewords = np.atleast_2d(np.asarray(codewords, dtype=np.uint8))
+        syndromes = self.syndromes(codewords)
+        messages = codewords[:, :-self.nsym].copy()
+        status = np.zeros(len(codewords), dtype=np.int64)
+        for row in np.flatnonzero(syndromes.any(axis=1)):
+            corrected = self._correct(codewords[row], syndromes[row])
+            if corrected is None:
+                status[row] = -1
+            else:
+                messages[row] = corrected[:-self.nsym]
+                status[row] = np.count_nonzero(corrected != codewords[row])
+        return messages, status
+
+    def _mul(self, a, b):
+        return int(self.mul[a, b])
+
+    def _inv(self, a):
+        return int(self.exp[255 - self.log[a]])
+
+    def _correct(self, codeword, syndromes):
+        syndromes = [int(s) for s in syndromes]
+        n = len(codeword)
+
+        # Berlekamp-Massey; polynomials are lowest degree first here
+        locator, previous = [1], [1]
+        degree, shift, last = 0, 1, 1
+        for step in range(self.nsym):
+            delta = syndromes[step]
+            for i in range(1, degree + 1):
+                if i < len(locator):
+                    delta ^= self._mul(locator[i], syndromes[step - i])
+            if delta == 0:
+                shift += 1
+                continue
+            scale = self._mul(delta, self._inv(last))
+            update = [0] * shift + [self._mul(scale, c) for c in previous]
+            candidate = [
+                (locator[i] if i < len(locator) else 0) ^ (update[i] if i < len(update) else 0)
+                for i in range(max(len(locator), len(update)))
+            ]
+            if 2 * degree <= step:
+                previous, degree, last, shift = locator, step + 1 - degree, delta, 1
+            else:
+                shift += 1
+            locator = candidate
+        locator = locator[:degree + 1]
+        if degree == 0 or 2 * degree > self.nsym:
+            return None
+
+        # Chien search over the n positions: position j has locator
+        # X_j = a^(n - 1 - j) and is in error iff locator(X_j^-1) == 0.
+        coeffs = np.array(locator)
+        nonzero = np.flatnonzero(coeffs)
+        exponents = (self.log[coeffs[nonzero]][:, None]
+                     - nonzero[:, None] * np.arange(n - 1, -1, -1)[None, :]) % 255
+        values = np.bitwise_xor.reduce(self.exp[exponents], axis=0)
+        positions = np.flatnonzero(values == 0)
+        if len(positions) != degree:
+            return None
+
+        # Forney: e_j = X_j^(1 - fcr) * omega(X_j^-1) / locator'(X_j^-1)
+        omega = [0] * self.nsym
+        for i, s in enumerate(syndromes):
+            for d, c in enumerate(locator):
+                if i + d < self.nsym:
+                    omega[i + d] ^= self._mul(s, c)
+
+        corrected = codeword.copy()
+        for j in positions:
+            log_x = (n - 1 - int(j)) % 255
+            log_x_inv = (255 - log_x) % 255
+            omega_value = 0
+            for d, c in enumerate(omega):
+                if c:
+                    omega_value ^= int(self.exp[(self.log[c] + d * log_x_inv) % 255])
+            derivative = 0
+            for d in range(1, len(locator), 2):
+                if locator[d]:
+                    derivative ^= int(self.exp[(self.log[locator[d]] + (d - 1) * log_x_inv) % 255])
+            if derivative == 0:
+                return None
+            magnitude = self._mul(omega_value, self._inv(derivative))
+            magnitude = self._mul(magnitude, int(self.exp[(log_x * (1 - self.fcr)) % 255]))
+            corrected[j] ^= magnitude
+
+        if self.syndromes(corrected).any():
+            return None
+        return corrected
@@ -0,0 +1,208 @@
+# ecc/simulation.py
+# Headless Monte Carlo BER/FER engine. A sweep is a list of points (codec,
+# channel, noise level); each point runs batches of random frames until it
+# has seen enough frame errors, frames or time, and points are spread over
+# a process pool with an independent RNG stream per point. Given a
+# ResultStore, a sweep reuses points simulated before and only runs the
+# frames still missing.
+import hashlib
+import json
+import math
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ecc.channel import apply_channel
+from ecc.error_analytics import ErrorAnalytics
+from ecc.frame_codecs import make_codec
+from ecc.profiling import stage
+from ecc.result_store import COUNT_FIELDS
+
+SweepPoint = namedtuple(
+    'SweepPoint',
+    ['codec', 'codec_params', 'channel', 'channel_params', 'level', 'soft'],
+    defaults=({}, 'bsc', {}, 0.01, False),
+)
+
+# Stopping rules for every point; any one reached ends the point.
+DEFAULT_STOP = {
+    'max_frame_errors': 100,
+    'max_frames': 100_000,
+    'time_budget': None,  # seconds
+    'batch_frames': 64,
+}
+
+
+def wilson_interval(errors, trials, z=1.96):
+    """Wilson score confidence interval for an error rate."""
+    if trials == 0:
+        return 0.0, 1.0
+    p = errors / trials
+    denom = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denom
+    spread = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+def resolve(point):
+    """The point with the codec's full parameters and the soft flag that
+    will actually be used, so equivalent points compare (and cache) equal."""
+    codec = make_codec(point.codec, **point.codec_params)
+    return point._replace(codec_params=codec.params(), channel_params=dict(point.channel_params),
+                          level=float(point.level), soft=bool(point.soft and codec.soft and point.channel == 'awgn'))
+
+
+def point_seed(seed, point, run=0):
+    """RNG seed for run `run` of a resolved point: derived from the sweep
+    seed and the point's configuration, not its position in the grid, so
+    overlapping grids simulate shared points identically."""
+    digest = hashlib.sha256(json.dumps(point._asdict(), sort_keys=True).encode()).digest()
+    return np.random.SeedSequence(seed, spawn_key=(int.from_bytes(digest[:8], 'big'), run))
+
+
+def point_result(point, frames, bits, frame_errors, bit_errors, seconds):
+    """Result dict of a resolved point from its counts."""
+    return {
+        'codec': point.codec,
+        'codec_params': point.codec_params,
+        'channel': point.channel,
+        'channel_params': dict(point.channel_params),
+        'level': point.level,
+        'soft': point.soft,
+        'frames': frames,
+        'bits': bits,
+        'frame_errors': frame_errors,
+        'bit_errors': bit_errors,
+        'fer': frame_errors / frames if frames else 0.0,
+        'ber': bit_errors / bits if bits else 0.0,
+        'fer_ci': wilson_interval(frame_errors, frames),
+        'ber_ci': wilson_interval(bit_errors, bits),
+        'seconds': seconds,
+    }
+
+
+def simulate_point(point, seed=None, max_frame_errors=100, max_frames=100_000,
+                   time_budget=None, batch_frames=64, analytics=False):
+    """Simulate one sweep point and return its counts, BER/FER and CIs.
+    With analytics, the result also carries an ErrorAnalytics snapshot of
+    where the channel and residual errors fell."""
+    codec = make_codec(point.codec, **point.codec_params)
+    rng = np.random.default_rng(seed)
+    rate = codec.data_bits / codec.code_bits
+    soft = bool(point.soft and codec.soft and point.channel == 'awgn')
+    tracker = ErrorAnalytics(syndrome_weight=getattr(codec, 'syndrome_weight', None)) if analytics else None
+
+    frames = frame_errors = bit_errors = 0
+    started = time.perf_counter()
+    while frames < max_frames and frame_errors < max_frame_errors:
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            break
+        count = min(batch_frames, max_frames - frames)
+        data = rng.integers(0, 2, (count, codec.data_bits), dtype=np.uint8)
+        encoded = codec.encode(data)
+        with stage(f'channel.{point.channel}', encoded.size):
+            received = apply_channel(point.channel, encoded, point.level, rng,
+                                     rate=rate, soft=soft, **point.channel_params)
+        decoded = codec.decode_soft(received) if soft else codec.decode(received)
+        errors = np.count_nonzero(decoded[:, :codec.data_bits] != data, axis=1)
+        frames += count
+        frame_errors += int(np.count_nonzero(errors))
+        bit_errors += int(errors.sum())
+        if tracker is not None:
+            with stage('analytics', encoded.size):
+                hard = (received < 0).astype(np.uint8) if soft else received
+                tracker.update(data, encoded, hard, decoded)
+
+    point = point._replace(codec_params=codec.params(), soft=soft)
+    result = point_result(point, frames, frames * codec.data_bits, frame_errors, bit_errors,
+                          time.perf_counter() - started)
+    if tracker is not None:
+        result['analytics'] = tracker.snapshot()
+    return result
+
+
+def grid(codecs, channels, levels, soft=False):
+    """Build sweep points for every codec x channel x level.
+
+    codecs and channels are names or (name, params) pairs; levels is a list
+    used for every channel or a dict of lists keyed by channel name.
+    """
+    def split(spec):
+        return (spec, {}) if isinstance(spec, str) else (spec[0], dict(spec[1]))
+
+    points = []
+    for codec in codecs:
+        codec_name, codec_params = split(codec)
+        for channel in channels:
+            channel_name, channel_params = split(channel)
+            channel_levels = levels[channel_name] if isinstance(levels, dict) else levels
+            for level in channel_levels:
+                points.append(SweepPoint(codec_name, codec_params, channel_name,
+                                         channel_params, level, soft))
+    return points
+
+
+def _missing(stored, options):
+    # stop options for the frames a stored point still lacks, None if done
+    if stored is None:
+        return options
+    frames = options['max_frames'] - stored['frames']
+    frame_errors = options['max_frame_errors'] - stored['frame_errors']
+    if frames <= 0 or frame_errors <= 0:
+        return None
+    return dict(options, max_frames=frames, max_frame_errors=frame_errors)
+
+
+def sweep(points, seed=0, workers=None, store=None, analytics=False, **stop):
+    """Simulate every point, in parallel unless workers == 1.
+
+    Each point is seeded from the sweep seed and its own configuration
+    (point_seed), so results do not depend on how points are scheduled or
+    which grid they are part of; points resolving to the same configuration
+    are simulated once and share the result. With a store, points already
+    simulated far enough (frames or frame errors reached) come from the
+    store, and the others only simulate the missing frames, as a new run
+    whose counts are merged into the stored ones. Returns results in point
+    order.
+
+    analytics adds an 'analytics' snapshot (ecc.error_analytics) to every
+    result. The store only holds counts, so it is neither read nor written
+    for such a sweep: every point is simulated afresh.
+    """
+    options = dict(DEFAULT_STOP, **stop)
+    if analytics:
+        store = None
+        options['analytics'] = True
+    results = [None] * len(points)
+    jobs = {}  # resolved config -> (indices, resolved point, seed, stop options)
+    for i, point in enumerate(points):
+        point = resolve(point)
+        key = json.dumps(point._asdict(), sort_keys=True)
+        if key in jobs:
+            # an equivalent point (e.g. defaults spelled out) is simulated once
+            jobs[key][0].append(i)
+            continue
+        stored = store.get(point._asdict(), seed) if store is not None else None
+        missing = _missing(stored, options)
+        if missing is None:
+            results[i] = point_result(point, *(stored[f] for f in COUNT_FIELDS))
+            continue
+        jobs[key] = ([i], point, point_seed(seed, point, stored['runs'] if stored else 0), missing)
+
+    jobs = list(jobs.values())
+    if workers == 1 or not jobs:
+        done = [simulate_point(p, s, **o) for _, p, s, o in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(simulate_point, p, s, **o) for _, p, s, o in jobs]
+            done = [f.result() for f in futures]
+
+    for (indices, point, _, _), result in zip(jobs, done):
+        if store is not None:
+            totals = store.add(point._asdict(), seed, result)
+            result = point_result(point, *(totals[f] for f in COUNT_FIELDS))
+        for i in indices:
+            results[i] = dict(result)
+    return results
@@ -1,20 +1,233 @@
 # ecc/stats_tracker.py
-stats = {
-    'Hamming': {'tested': 0, 'corrected': 0},
-    'Reed-Solomon': {'tested': 0, 'corrected': 0},
-    'Convolutional': {'tested': 0, 'corrected': 0}
+# Codec outcome metrics. Every thread records into its own shard (a private
+# lock that is only contended while a snapshot is being read) and snapshots
+# merge the shards. Worker processes send their snapshot() back and the
+# parent folds it in with merge(), so a simulation farm aggregates into one
+# tracker. Snapshots are plain dicts: picklable, JSON-serialisable, and
+# exportable in the Prometheus text format.
+import json
+import os
+import threading
+from bisect import bisect_left
+
+# Histogram bucket upper bounds; values above the last go in an overflow bucket.
+COUNT_BOUNDS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 12, 16, 24, 32, 48, 64, 128, 256)
+LATENCY_BOUNDS = tuple(1e-6 * 2 ** i for i in range(28))  # 1 us .. 134 s
+
+HISTOGRAMS = {
+    'corrected_errors': COUNT_BOUNDS,
+    'residual_errors': COUNT_BOUNDS,
+    'encode_seconds': LATENCY_BOUNDS,
+    'decode_seconds': LATENCY_BOUNDS,
 }
 
-def update_stats(ecc_type, corrected):
-    stats[ecc_type]['tested'] += 1
-    if corrected:
-        stats[ecc_type]['corrected'] += 1
+DEFAULT_CODECS = ('Hamming', 'Reed-Solomon', 'Convolutional', 'Concatenated')
+
+
+def _empty_histogram(bounds):
+    return {'bounds': list(bounds), 'counts': [0] * (len(bounds) + 1), 'sum': 0.0, 'count': 0}
+
+
+def _empty_codec():
+    stats = {'tested': 0, 'corrected': 0}
+    for name, bounds in HISTOGRAMS.items():
+        stats[name] = _empty_histogram(bounds)
+    return stats
+
+
+def _observe(histogram, value):
+    histogram['counts'][bisect_left(histogram['bounds'], value)] += 1
+    histogram['sum'] += value
+    histogram['count'] += 1
+
+
+def _merge_into(target, source):
+    for codec, stats in source.items():
+        merged = target.setdefault(codec, _empty_codec())
+        merged['tested'] += stats['tested']
+        merged['corrected'] += stats['corrected']
+        for name in HISTOGRAMS:
+            hist, other = merged[name], stats[name]
+            hist['counts'] = [a + b for a, b in zip(hist['counts'], other['counts'])]
+            hist['sum'] += other['sum']
+            hist['count'] += other['count']
+
+
+def percentile(histogram, q):
+    """Estimate the q-th percentile (0-100) of a histogram, interpolating
+    linearly inside the bucket that holds it; None when it is empty."""
+    if not histogram['count']:
+        return None
+    rank = q / 100 * histogram['count']
+    bounds = histogram['bounds']
+    seen = 0
+    for i, count in enumerate(histogram['counts']):
+        if count and seen + count >= rank:
+            if i == len(bounds):
+                return bounds[-1]
+            low = bounds[i - 1] if i else 0
+            return low + (bounds[i] - low) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
+
+
+class _Shard:
+    __slots__ = ('lock', 'codecs')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.codecs = {}
+
+
+class StatsTracker:
+    def __init__(self, codecs=DEFAULT_CODECS):
+        self._codecs = tuple(codecs)
+        self._local = threading.local()
+        self._shards = []
+        self._merged = {}  # snapshots folded in from other processes
+        self._registry = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._registry:
+                self._shards.append(shard)
+        return shard
+
+    def record(self, codec, corrected, corrected_errors=None, residual_errors=None,
+               encode_seconds=None, decode_seconds=None):
+        """Count one decoded message of `codec`. corrected says whether it was
+        recovered; the optional values feed the histograms."""
+        shard = self._shard()
+        with shard.lock:
+            stats = shard.codecs.get(codec)
+            if stats is None:
+                stats = shard.codecs[codec] = _empty_codec()
+            stats['tested'] += 1
+            if corrected:
+                stats['corrected'] += 1
+            for name, value in (('corrected_errors', corrected_errors),
+                                ('residual_errors', residual_errors),
+                                ('encode_seconds', encode_seconds),
+                                ('decode_seconds', decode_seconds)):
+                if value is not None:
+                    _observe(stats[name], value)
+
+    def snapshot(self):
+        """Merged counts and histograms of every shard, keyed by codec."""
+        merged = {codec: _empty_codec() for codec in self._codecs}
+        with self._registry:
+            shards = list(self._shards)
+            _merge_into(merged, self._merged)
+        for shard in shards:
+            with shard.lock:
+                _merge_into(merged, shard.codecs)
+        return merged
+
+    def counts(self):
+        """{codec: (tested, corrected)} summed over the shards without
+        touching the histograms; cheap enough to poll from a dashboard."""
+        rows = []
+        with self._registry:
+            shards = list(self._shards)
+            rows += [(codec, s['tested'], s['corrected']) for codec, s in self._merged.items()]
+        for shard in shards:
+            with shard.lock:
+                rows += [(codec, s['tested'], s['corrected']) for codec, s in shard.codecs.items()]
+        totals = {codec: (0, 0) for codec in self._codecs}
+        for codec, tested, corrected in rows:
+            old_tested, old_corrected = totals.get(codec, (0, 0))
+            totals[codec] = (old_tested + tested, old_corrected + corrected)
+        return totals
+
+    def merge(self, snapshot):
+        """Fold in a snapshot taken elsewhere, e.g. in a worker process."""
+        with self._registry:
+            _merge_into(self._merged, snapshot)
+
+    def reset(self):
+        with self._registry:
+            shards = list(self._shards)
+            self._merged = {}
+        for shard in shards:
+            with shard.lock:
+                shard.codecs.clear()
+
+    def summary(self, quantiles=(50, 90, 99)):
+        """Per codec: counts, success rate and histogram means/percentiles."""
+        result = {}
+        for codec, stats in self.snapshot().items():
+            entry = {
+                'tested': stats['tested'],
+                'corrected': stats['corrected'],
+                'success_rate': stats['corrected'] / stats['tested'] * 100 if stats['tested'] else 0,
+            }
+            for name in HISTOGRAMS:
+                hist = stats[name]
+                entry[name] = {
+                    'count': hist['count'],
+                    'mean': hist['sum'] / hist['count'] if hist['count'] else None,
+                    **{f'p{q}': percentile(hist, q) for q in quantiles},
+                }
+            result[codec] = entry
+        return result
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'snapshot': self.snapshot()}, f, indent=2)
+
+    def export_prometheus(self, path, prefix='ecc'):
+        """Write the snapshot in the Prometheus text exposition format (for
+        the node exporter textfile collector). The file is replaced
+        atomically so a scrape never sees it half written."""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(prometheus_text(self.snapshot(), prefix))
+        os.replace(tmp, path)
+
+
+def prometheus_text(snapshot, prefix='ecc'):
+    lines = []
+    for metric, key, help_text in (('messages_tested_total', 'tested', 'Messages decoded'),
+                                   ('messages_corrected_total', 'corrected', 'Messages recovered')):
+        lines += [f'# HELP {prefix}_{metric} {help_text}.', f'# TYPE {prefix}_{metric} counter']
+        for codec, stats in snapshot.items():
+            lines.append(f'{prefix}_{metric}{{codec="{codec}"}} {stats[key]}')
+    for name in HISTOGRAMS:
+        lines += [f'# HELP {prefix}_{name} Distribution of {name.replace("_", " ")}.',
+                  f'# TYPE {prefix}_{name} histogram']
+        for codec, stats in snapshot.items():
+            hist = stats[name]
+            cumulative = 0
+            for bound, count in zip(hist['bounds'] + ['+Inf'], hist['counts']):
+                cumulative += count
+                lines.append(f'{prefix}_{name}_bucket{{codec="{codec}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_{name}_sum{{codec="{codec}"}} {hist["sum"]}')
+            lines.append(f'{prefix}_{name}_count{{codec="{codec}"}} {hist["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+tracker = StatsTracker()
+
+
+def update_stats(ecc_type, corrected, **details):
+    tracker.record(ecc_type, corrected, **details)
 
 def get_success_rates():
     return {
-        ecc: (val['corrected'] / val['tested'] * 100 if val['tested'] else 0)
-        for ecc, val in stats.items()
+        ecc: (corrected / tested * 100 if tested else 0)
+        for ecc, (tested, corrected) in tracker.counts().items()
     }
 
 def get_raw_stats():
-    return stats
+    return {
+        ecc: {'tested': tested, 'corrected': corrected}
+        for ecc, (tested, corrected) in tracker.counts().items()
+    }
+
+def get_counts():
+    return tracker.counts()
+
+def get_snapshot():
+    return tracker.snapshot()
@@ -1,17 +1,384 @@
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
-    QVBoxLayout, QMessageBox, QComboBox, QTextEdit, QHBoxLayout
+    QVBoxLayout, QMessageBox, QComboBox, QTextEdit, QHBoxLayout, QCheckBox,
+    QProgressBar
 )
+from PyQt5.QtCore import QTimer
+import importlib
+import os
 import sys
 import random
-from ui.error_visualizer import plot_error_patterns
-import matplotlib.pyplot as plt
+import threading
+import time
+import numpy as np
 from ecc.hamming import hamming_encode, hamming_decode
-from ecc.reed_solomon import rs_encode, rs_decode
-from ecc.convolutional import conv_encode, conv_decode
-from ecc.noise import flip_bit_str, flip_random_bits, burst_flip, gaussian_flip
-from ui.bitplot import visualize_bits
-from ui.animation_window import AnimationWindow
+from ecc.reed_solomon import codec_pool, rs_encode, rs_decode
+from ecc.convolutional import conv_encode, conv_decode, StreamingViterbiDecoder
+from ecc.noise import flip_bit_str, flip_random_bits, burst_flip, gaussian_flip, interleaved_burst_flip
+from ecc.stats_tracker import update_stats
+from ecc.bitbuffer import BitBuffer, as_bits
+from ecc.pipeline import concatenated
+from ecc import profiling
+from ui.workers import WorkerPool
+
+
+# Plotting and the animation window pull in matplotlib, which takes longer
+# to import than the rest of the GUI together, so they are imported on
+# first use. Once the window is up, warm_up() loads them (and builds the
+# default Reed-Solomon tables) on a background thread, which usually
+# finishes before the first plot is needed.
+DEFERRED_MODULES = ('matplotlib.pyplot', 'ui.error_visualizer', 'ui.bitplot', 'ui.animation_window')
+
+
+def warm_up():
+    for name in DEFERRED_MODULES:
+        importlib.import_module(name)
+    codec_pool.get()
+    codec_pool.get_batch()
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    plt.ion()  # plot windows must not block the Qt event loop
+    return plt
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _differences(a, b):
+    # differing positions of two strings, byte buffers or BitBuffers,
+    # counting any length mismatch as differences
+    if isinstance(a, BitBuffer) and isinstance(b, BitBuffer):
+        common = min(len(a), len(b))
+        return a[:common].distance(b[:common]) + abs(len(a) - len(b))
+    return sum(x != y for x, y in zip(a, b)) + abs(len(a) - len(b))
+
+
+def _apply_noise(noise_model, data):
+    data_len = len(data)
+
+    if noise_model == "Random Flip":
+        flip_count = 1 if data_len <= 10 else 2
+        return flip_random_bits(data, flip_count=flip_count)
+    elif noise_model == "Burst Error":
+        burst_length = 2 if data_len <= 10 else 3
+        return burst_flip(data, burst_length=burst_length)
+    elif noise_model == "Burst Error (Interleaved)":
+        burst_length = 2 if data_len <= 10 else 3
+        return interleaved_burst_flip(data, burst_length=burst_length)
+    elif noise_model == "Gaussian Noise":
+        intensity = 0.1 if data_len <= 10 else 0.2
+        return gaussian_flip(data, intensity=intensity)
+    else:
+        return flip_random_bits(data, flip_count=1)
+
+
+# Received bits per step when decoding long convolutional input, so that
+# progress and cancellation reach the GUI during the decode.
+_DECODE_CHUNK = 16384
+
+
+def _conv_decode_with_progress(noisy, progress):
+    if len(noisy) <= _DECODE_CHUNK:
+        return conv_decode(noisy)
+    decoder = StreamingViterbiDecoder(block=_DECODE_CHUNK // 2)
+    out = []
+    for start in range(0, len(noisy), _DECODE_CHUNK):
+        chunk = noisy[start:start + _DECODE_CHUNK]  # a view, nothing copied
+        out.append(decoder.feed(chunk))
+        progress(start + len(chunk), len(noisy))
+    out.append(decoder.flush())
+    return BitBuffer.from_bits(np.concatenate(out))
+
+
+# The simulate_* functions run on worker threads: they only touch their
+# arguments and the thread-safe stats tracker, and return everything the
+# GUI needs to display in a dict.
+
+def _profiled_job(fn):
+    def job(*args, progress):
+        if not profiling.is_enabled():
+            return dict(fn(*args, progress=progress), stages=None)
+        with profiling.capture() as stages:
+            result = fn(*args, progress=progress)
+        return dict(result, stages=stages)
+    return job
+
+
+@_profiled_job
+def simulate_codec(algo, data, noise_model, progress):
+    result = ""
+    outcomes = []
+    errors = None  # (data, sent, received, decoded) for the error analytics
+    bits = None
+    progress(0, 3)
+
+    if algo == "Hamming Code":
+        encoded, encode_seconds = _timed(hamming_encode, data)
+        progress(1, 3)
+        noisy = _apply_noise(noise_model, encoded)
+        progress(2, 3)
+        (decoded, err_pos), decode_seconds = _timed(hamming_decode, noisy)
+
+        success = decoded == data
+        outcomes.append(success)
+        update_stats("Hamming", success,
+                     corrected_errors=_differences(noisy, hamming_encode(decoded)),
+                     residual_errors=_differences(decoded, data),
+                     encode_seconds=encode_seconds, decode_seconds=decode_seconds)
+
+        status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
+
+        result = f"""
+[HAMMING CODE]
+Input:              {data}
+Encoded:            {encoded}
+Noisy Encoded:      {noisy}
+Decoded:            {decoded}
+Error Corrected At: {err_pos if err_pos else 'None'}
+Status:             {status}
+"""
+
+        # visualize_bits marks the bits that differ from the encoded row
+        bits = (["Encoded", "Noisy", "Decoded"],
+                [encoded, noisy, hamming_encode(decoded)])
+        errors = (data, encoded, noisy, decoded)
+
+    elif algo == "Reed-Solomon":
+        encoded, encode_seconds = _timed(rs_encode, data)
+        progress(1, 3)
+        noisy = _apply_noise(noise_model, encoded)
+        progress(2, 3)
+        (decoded, error), decode_seconds = _timed(rs_decode, noisy)
+
+        success = decoded == data
+        outcomes.append(success)
+        update_stats("Reed-Solomon", success,
+                     corrected_errors=_differences(noisy, rs_encode(decoded)) if decoded is not None else 0,
+                     residual_errors=_differences(decoded, data) if decoded is not None else len(data),
+                     encode_seconds=encode_seconds, decode_seconds=decode_seconds)
+
+        status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
+
+        result = f"""
+[REED-SOLOMON]
+Input:         {data}
+Encoded:       {encoded}
+Noisy:         {noisy}
+Decoded:       {decoded if decoded else 'Decoding Failed'}
+Error:         {error if error else 'None'}
+Status:        {status}
+"""
+
+    elif algo == "Convolutional Code":
+        # packed from here on; only the report below formats the bits as text
+        data = BitBuffer.from_str(data)
+        encoded, encode_seconds = _timed(conv_encode, data)
+        progress(1, 3)
+        noisy = _apply_noise(noise_model, encoded)
+        progress(2, 3)
+        decoded, decode_seconds = _timed(_conv_decode_with_progress, noisy,
+                                         lambda done, total: progress(2 * total + done, 3 * total))
+
+        success = decoded == data
+        outcomes.append(success)
+        update_stats("Convolutional", success,
+                     corrected_errors=_differences(noisy, conv_encode(decoded)),
+                     residual_errors=_differences(decoded, data),
+                     encode_seconds=encode_seconds, decode_seconds=decode_seconds)
+
+        status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
+
+        result = f"""
+[CONVOLUTIONAL CODE]
+Input:              {data}
+Encoded:            {encoded}
+Noisy Encoded:      {noisy}
+Decoded:            {decoded}
+Status:             {status}
+"""
+
+        # visualize_bits marks the bits that differ from the encoded row
+        bits = (["Encoded", "Noisy", "Decoded"],
+                [encoded, noisy, conv_encode(decoded)])
+        errors = (data, encoded, noisy, decoded)
+
+    elif algo == "Concatenated (RS + Conv)":
+        # outer RS over 4 interleaved codewords, inner convolutional code;
+        # the frame is sized to the input so short text stays one frame
+        payload = data.encode()
+        pipe = concatenated(frame_bits=max(32, min(len(payload), 4 * 223) * 8))
+        encoded, encode_seconds = _timed(lambda: BitBuffer.from_bits(pipe.encode_bytes(payload)))
+        progress(1, 3)
+        noisy = _apply_noise(noise_model, encoded)
+        progress(2, 3)
+        decoded, decode_seconds = _timed(pipe.decode_bytes, noisy.to_bits(), len(payload))
+
+        success = decoded == payload
+        channel_errors = _differences(noisy, encoded)
+        outcomes.append(success)
+        update_stats("Concatenated", success,
+                     corrected_errors=channel_errors if success else None,
+                     residual_errors=_differences(decoded, payload),
+                     encode_seconds=encode_seconds, decode_seconds=decode_seconds)
+
+        status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
+
+        result = f"""
+[CONCATENATED RS + CONVOLUTIONAL]
+Input:              {data}
+Pipeline:           {pipe}
+Encoded:            {len(encoded)} bits
+Channel Errors:     {channel_errors}
+Decoded:            {decoded.decode(errors='replace')}
+Status:             {status}
+"""
+
+        bits = (["Encoded", "Noisy"], [encoded, noisy])
+        errors = (np.unpackbits(np.frombuffer(payload, dtype=np.uint8)), encoded, noisy,
+                  np.unpackbits(np.frombuffer(decoded, dtype=np.uint8)))
+
+    elif algo == "🔀 Compare All (Side-by-Side)":
+        result = "[COMPARISON MODE]\n\n"
+
+        if len(data) == 4 and all(c in '01' for c in data):
+            encoded = hamming_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded, err_pos = hamming_decode(noisy)
+            update_stats("Hamming", decoded == data)
+            status = "✅" if decoded == data else "❌"
+            result += f"🔹 Hamming Code: {status}\n"
+        progress(1, 3)
+
+        if all(c in '01' for c in data):
+            encoded = conv_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded = _conv_decode_with_progress(noisy, lambda done, total: progress(1, 3))
+            update_stats("Convolutional", decoded == data)
+            status = "✅" if decoded == data else "❌"
+            result += f"🔹 Convolutional Code: {status}\n"
+        progress(2, 3)
+
+        if data and not all(c in '01' for c in data):
+            encoded = rs_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded, error = rs_decode(noisy)
+            update_stats("Reed-Solomon", decoded == data)
+            status = "✅" if decoded == data else "❌"
+            result += f"🔹 Reed-Solomon Code: {status}\n"
+        else:
+            result += "🔹 Reed-Solomon Code: Skipped (binary input)\n"
+
+    progress(3, 3)
+    return {'algo': algo, 'text': result, 'outcomes': outcomes, 'errors': errors, 'bits': bits}
+
+
+# GUI algorithms the recommender chooses between, as frame codec configurations
+RECOMMENDER_CODECS = {
+    "Hamming Code": ('hamming', {}),
+    "Convolutional Code": ('convolutional', {}),
+    "Reed-Solomon": ('reed-solomon', {'nsym': 10}),
+    "Concatenated (RS + Conv)": ('concatenated', {}),
+}
+RECOMMEND_MAX_FER = 0.01  # messages not recovered
+RECOMMEND_SECONDS = 3.0
+
+
+def _message_channel(noise_model, data):
+    # the ecc.channel model for the noise _apply_noise puts on one encoded
+    # message (approximately: its strength depends on the encoded length,
+    # taken here as short only for 4-bit Hamming input); an interleaved
+    # burst arrives as isolated flips once deinterleaved
+    from ecc.recommender import Channel
+    short = len(data) <= 4
+    if noise_model == "Burst Error":
+        return Channel('burst', 2 if short else 3)
+    if noise_model == "Burst Error (Interleaved)":
+        return Channel('flips', 2 if short else 3)
+    if noise_model == "Gaussian Noise":
+        return Channel('bsc', 0.1 if short else 0.2)
+    return Channel('flips', 1 if short or noise_model != "Random Flip" else 2)
+
+
+@_profiled_job
+def recommend_codec(data, noise_model, progress):
+    from ecc.recommender import Constraints, Recommender, format_table
+    from ecc.result_store import DEFAULT_PATH, ResultStore
+
+    if all(c in '01' for c in data):
+        algos = (["Hamming Code"] if len(data) == 4 else []) + ["Convolutional Code"]
+        frame_bits = len(data)
+    else:
+        algos = ["Reed-Solomon", "Concatenated (RS + Conv)"]
+        frame_bits = 8 * len(data.encode())
+    channel = _message_channel(noise_model, data)
+    # measured rates and speeds persist between sessions, so a message size
+    # and noise model seen before is answered without simulating
+    with ResultStore(os.environ.get('ECC_RESULT_STORE') or DEFAULT_PATH) as store:
+        recommender = Recommender(store, [RECOMMENDER_CODECS[a] for a in algos], frame_bits)
+        evaluations = recommender.evaluate(channel, Constraints(max_ber=None, max_fer=RECOMMEND_MAX_FER),
+                                           RECOMMEND_SECONDS, progress)
+    names = {RECOMMENDER_CODECS[a][0]: a for a in algos}
+    return {'evaluations': evaluations, 'algos': [names[e.codec] for e in evaluations],
+            'text': f"[RECOMMENDATION]\nChannel: {channel}\n\n{format_table(evaluations)}"}
+
+
+@_profiled_job
+def simulate_battle(noise_model, rounds, progress):
+    data_samples = ["1101", "1010", "hello", "0110", "world", "1110", "0011", "data"]
+    hamming_success = 0
+    conv_success = 0
+    rs_success = 0
+
+    for done in range(rounds):
+        progress(done, rounds)
+        data = random.choice(data_samples)
+
+        if len(data) == 4 and all(c in '01' for c in data):
+            encoded = hamming_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded, err_pos = hamming_decode(noisy)
+            update_stats("Hamming", decoded == data)
+            if decoded == data:
+                hamming_success += 1
+
+        if all(c in '01' for c in data):
+            encoded = conv_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded = conv_decode(noisy)
+            update_stats("Convolutional", decoded == data)
+            if decoded == data:
+                conv_success += 1
+
+        if not all(c in '01' for c in data):
+            encoded = rs_encode(data)
+            noisy = _apply_noise(noise_model, encoded)
+            decoded, error = rs_decode(noisy)
+            update_stats("Reed-Solomon", decoded == data)
+            if decoded == data:
+                rs_success += 1
+    progress(rounds, rounds)
+
+    hamming_accuracy = (hamming_success / rounds) * 100
+    conv_accuracy = (conv_success / rounds) * 100
+    rs_accuracy = (rs_success / rounds) * 100
+
+    result_text = f"""
+        🏆 ECC Battle Mode Results ({rounds} rounds)
+
+        Hamming Code Accuracy:       {hamming_accuracy:.2f}%
+        Convolutional Code Accuracy: {conv_accuracy:.2f}%
+        Reed-Solomon Code Accuracy:   {rs_accuracy:.2f}%
+            """
+
+    accuracies = {'Hamming': hamming_accuracy, 'Convolutional': conv_accuracy,
+                  'Reed-Solomon': rs_accuracy}
+    return {'text': result_text.strip(), 'accuracies': accuracies}
+
 
 class ECCWindow(QWidget):
     def __init__(self):
@@ -22,8 +389,11 @@ class ECCWindow(QWidget):
         self.total_inputs = 0
         self.total_errors = 0
         self.total_corrected = 0
+        self.error_analytics = {}  # algo -> ErrorAnalytics over every run so far
 
+        self.workers = WorkerPool(parent=self)
         self.setup_ui()
+        self.workers.pending.connect(self._show_pending)
 
     def setup_ui(self):
         layout = QVBoxLayout()
@@ -33,6 +403,7 @@ class ECCWindow(QWidget):
             "Hamming Code",
             "Reed-Solomon",
             "Convolutional Code",
+            "Concatenated (RS + Conv)",
             "🔀 Compare All (Side-by-Side)",
             "Parity Step Animation (Hamming)",
             "Parity Step Animation (Convolutional)",
@@ -44,6 +415,7 @@ class ECCWindow(QWidget):
         self.select_noise.addItems([
             "Random Flip",
             "Burst Error",
+            "Burst Error (Interleaved)",
             "Gaussian Noise"
         ])
 
@@ -68,31 +440,36 @@ class ECCWindow(QWidget):
         layout.addWidget(QLabel("Select Noise Model:"))
         layout.addWidget(self.select_noise)
 
+        self.profile_checkbox = QCheckBox("Profile stages (encode / noise / decode / plots)")
+        self.profile_checkbox.setChecked(profiling.is_enabled())
+        self.profile_checkbox.toggled.connect(
+            lambda on: profiling.enable() if on else profiling.disable())
+        layout.addWidget(self.profile_checkbox)
+
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(self.encode_button)
         btn_layout.addWidget(self.recommend_button)
 
         layout.addLayout(btn_layout)
+
+        self.progress_bar = QProgressBar()
+        self.queue_label = QLabel("Idle")
+        self.cancel_button = QPushButton("✖ Cancel Runs")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.workers.cancel_all)
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.queue_label)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+
         layout.addWidget(QLabel("Results:"))
         layout.addWidget(self.output_text)
 
         self.setLayout(layout)
 
     def apply_noise(self, data: str) -> str:
-        noise_model = self.select_noise.currentText()
-        data_len = len(data)
-
-        if noise_model == "Random Flip":
-            flip_count = 1 if data_len <= 10 else 2
-            return flip_random_bits(data, flip_count=flip_count)
-        elif noise_model == "Burst Error":
-            burst_length = 2 if data_len <= 10 else 3
-            return burst_flip(data, burst_length=burst_length)
-        elif noise_model == "Gaussian Noise":
-            intensity = 0.1 if data_len <= 10 else 0.2
-            return gaussian_flip(data, intensity=intensity)
-        else:
-            return flip_random_bits(data, flip_count=1)
+        return _apply_noise(self.select_noise.currentText(), data)
 
     def recommend_ecc(self):
         data = self.input_field.text().strip()
@@ -100,94 +477,72 @@ class ECCWindow(QWidget):
             QMessageBox.warning(self, "Input Error", "Please enter some input data first.")
             return
 
-        recommendation = ""
-        reason = ""
-
-        if all(c in '01' for c in data):
-            if len(data) <= 4:
-                recommendation = "Hamming Code"
-                reason = "Short binary input (≤ 4 bits) is best handled by Hamming."
-            else:
-                recommendation = "Convolutional Code"
-                reason = "Long binary input is better suited to Convolutional codes."
+        self._submit(recommend_codec, data, self.select_noise.currentText(),
+                     on_result=self._show_recommendation)
+
+    def _show_recommendation(self, result):
+        self.output_text.setText(result['text'])
+        best, algo = result['evaluations'][0], result['algos'][0]
+        measured = (f"FER {best.fer:.3g} (≤ {best.fer_high:.3g}) over {best.frames} messages, "
+                    f"code rate {best.rate:.2f}, {best.throughput / 1e6:.1f} Mbit/s")
+        if best.status in ('verified', 'likely'):
+            confidence = "confirmed" if best.status == 'verified' else "not yet confirmed"
+            QMessageBox.information(self, "ECC Recommendation",
+                f"🔍 Recommended ECC: {algo}\n\n📌 Measured on this noise model: {measured}\n"
+                f"Target FER ≤ {RECOMMEND_MAX_FER} {confidence}.")
         else:
-            recommendation = "Reed-Solomon"
-            reason = "Text input is best protected by Reed-Solomon codes."
-
-        if self.total_errors > 0:
-            rate = self.total_corrected / self.total_errors
-            if rate > 0.8:
-                reason += f"\nNote: High correction rate so far ({rate*100:.1f}%)."
-
-        QMessageBox.information(self, "ECC Recommendation",
-            f"🔍 Recommended ECC: {recommendation}\n\n📌 Reason: {reason}"
-        )
+            QMessageBox.information(self, "ECC Recommendation",
+                f"No ECC reaches FER ≤ {RECOMMEND_MAX_FER} on this noise model.\n\n"
+                f"🔍 Closest: {algo}\n📌 {measured}")
+        self._show_profile(result)
+
+    def _submit(self, fn, *args, on_result):
+        self.progress_bar.setValue(0)
+        self.output_text.setText("⏳ Running...")
+        self.workers.submit(fn, *args, on_result=on_result, on_progress=self._show_progress,
+                            on_error=self._show_error,
+                            on_cancelled=lambda: self.output_text.setText("✖ Run cancelled."))
+
+    def _show_progress(self, done, total):
+        self.progress_bar.setMaximum(max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def _show_pending(self, count):
+        self.cancel_button.setEnabled(count > 0)
+        self.queue_label.setText(f"Queued runs: {count}" if count else "Idle")
+        if not count:
+            self.progress_bar.setValue(self.progress_bar.maximum())
+
+    def _show_error(self, message):
+        self.output_text.setText(f"❌ Simulation failed:\n{message}")
+
+    def _show_profile(self, result, plot_stages=None):
+        if result.get('stages') is not None:
+            stages = dict(result['stages'], **(plot_stages or {}))
+            self.output_text.append("\n[STAGE PROFILE]\n" + profiling.format_report(stages))
 
     def run_battle_mode(self):
-            rounds = 100
-            data_samples = ["1101", "1010", "hello", "0110", "world", "1110", "0011", "data"]
-            hamming_success = 0
-            conv_success = 0
-            rs_success = 0
-
-            for _ in range(rounds):
-                data = random.choice(data_samples)
-
-            if len(data) == 4 and all(c in '01' for c in data):
-                encoded = hamming_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded, err_pos = hamming_decode(noisy)
-                if decoded == data:
-                    hamming_success += 1
-
-            if all(c in '01' for c in data):
-                encoded = conv_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded = conv_decode(noisy)
-                if decoded == data:
-                    conv_success += 1
-
-            if not all(c in '01' for c in data):
-                encoded = rs_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded, error = rs_decode(noisy)
-                if decoded == data:
-                    rs_success += 1
-
-            hamming_accuracy = (hamming_success / rounds) * 100
-            conv_accuracy = (conv_success / rounds) * 100
-            rs_accuracy = (rs_success / rounds) * 100
-
-            result_text = f"""
-        🏆 ECC Battle Mode Results ({rounds} rounds)
-
-        Hamming Code Accuracy:       {hamming_accuracy:.2f}%
-        Convolutional Code Accuracy: {conv_accuracy:.2f}%
-        Reed-Solomon Code Accuracy:   {rs_accuracy:.2f}%
-            """
-
-            self.output_text.setText(result_text.strip())
-
-            ecc_names = ['Hamming', 'Convolutional', 'Reed-Solomon']
-            accuracies = [hamming_accuracy, conv_accuracy, rs_accuracy]
-
-            plt.figure(figsize=(8,5))
-            plt.bar(ecc_names, accuracies, color=['blue', 'green', 'orange'])
-            plt.ylim(0, 100)
-            plt.ylabel('Accuracy (%)')
-            plt.title('ECC Battle Mode: Correction Accuracy')
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-            plt.show()
-
+        self._submit(simulate_battle, self.select_noise.currentText(), 100,
+                     on_result=self._show_battle)
+
+    def _show_battle(self, result):
+        self.output_text.setText(result['text'])
+        with profiling.capture() as plot_stages:
+            with profiling.stage("battle_plot"):
+                plt = _pyplot()
+                plt.figure(figsize=(8,5))
+                plt.bar(list(result['accuracies']), list(result['accuracies'].values()),
+                        color=['blue', 'green', 'orange'])
+                plt.ylim(0, 100)
+                plt.ylabel('Accuracy (%)')
+                plt.title('ECC Battle Mode: Correction Accuracy')
+                plt.grid(axis='y', linestyle='--', alpha=0.7)
+                plt.show()
+        self._show_profile(result, plot_stages)
 
     def run_simulation(self):
         algo = self.select_algo.currentText()
         data = self.input_field.text().strip()
-        noise_model = self.select_noise.currentText()
-        result = ""
-        labels = []
-        sequences = []
-        highlights = []
 
         if algo == "🚀 ECC Battle Mode":
             self.run_battle_mode()
@@ -206,6 +561,7 @@ class ECCWindow(QWidget):
             if ecc_type == "Reed-Solomon" and (not data or all(c in '01' for c in data)):
                 QMessageBox.warning(self, "Input Error", "Enter TEXT data for Reed-Solomon Animation.")
                 return
+            from ui.animation_window import AnimationWindow
             self.anim_window = AnimationWindow(data, ecc_type=ecc_type)
             self.anim_window.show()
             return
@@ -214,126 +570,68 @@ class ECCWindow(QWidget):
             if len(data) != 4 or any(c not in '01' for c in data):
                 QMessageBox.warning(self, "Input Error", "Enter 4-bit binary for Hamming.")
                 return
-
-            encoded = hamming_encode(data)
-            noisy = self.apply_noise(encoded)
-            decoded, err_pos = hamming_decode(noisy)
-
-            success = decoded == data
-            self.total_errors += 1
-            if success:
-                self.total_corrected += 1
-
-            status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
-
-            result = f"""
-[HAMMING CODE]
-Input:              {data}
-Encoded:            {encoded}
-Noisy Encoded:      {noisy}
-Decoded:            {decoded}
-Error Corrected At: {err_pos if err_pos else 'None'}
-Status:             {status}
-"""
-
-            labels = ["Encoded", "Noisy", "Decoded"]
-            sequences = [encoded, noisy, hamming_encode(decoded)]
-            highlights = [[False]*len(encoded) for _ in range(3)]
-
-            plot_error_patterns(data, noisy, decoded)
-
         elif algo == "Reed-Solomon":
             if not data or all(c in '01' for c in data):
                 QMessageBox.warning(self, "Input Error", "Enter text (non-binary) data for Reed-Solomon.")
                 return
-
-            encoded = rs_encode(data)
-            noisy = self.apply_noise(encoded)
-            decoded, error = rs_decode(noisy)
-
-            success = decoded == data
-            self.total_errors += 1
-            if success:
-                self.total_corrected += 1
-
-            status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
-
-            result = f"""
-[REED-SOLOMON]
-Input:         {data}
-Encoded:       {encoded}
-Noisy:         {noisy}
-Decoded:       {decoded if decoded else 'Decoding Failed'}
-Error:         {error if error else 'None'}
-Status:        {status}
-"""
-
         elif algo == "Convolutional Code":
             if len(data) == 0 or any(c not in '01' for c in data):
                 QMessageBox.warning(self, "Input Error", "Enter binary string for Convolutional Code.")
                 return
+        elif algo == "Concatenated (RS + Conv)":
+            if not data:
+                QMessageBox.warning(self, "Input Error", "Enter data for the concatenated code.")
+                return
 
-            encoded = conv_encode(data)
-            noisy = self.apply_noise(encoded)
-            decoded = conv_decode(noisy)
+        self._submit(simulate_codec, algo, data, self.select_noise.currentText(),
+                     on_result=self._show_simulation)
 
-            success = decoded == data
+    def _show_simulation(self, result):
+        for success in result['outcomes']:
             self.total_errors += 1
             if success:
                 self.total_corrected += 1
 
-            status = "✅ Recovered Correctly" if success else "❌ Decoding Failed"
-
-            result = f"""
-[CONVOLUTIONAL CODE]
-Input:              {data}
-Encoded:            {encoded}
-Noisy Encoded:      {noisy}
-Decoded:            {decoded}
-Status:             {status}
-"""
+        self.output_text.setText(result['text'].strip())
+
+        with profiling.capture() as plot_stages:
+            if result['errors'] or result['bits']:
+                _pyplot()
+            if result['errors']:
+                from ui.error_visualizer import plot_error_analytics
+                analytics = self._error_analytics(result['algo'])
+                with profiling.stage("error_analytics"):
+                    analytics.update(*(as_bits(bits) for bits in result['errors']))
+                with profiling.stage("plot_error_analytics"):
+                    plot_error_analytics(analytics, f"{result['algo']} - Error Analytics")
+            if result['bits']:
+                from ui.bitplot import visualize_bits
+                with profiling.stage("visualize_bits"):
+                    visualize_bits(f"{result['algo']} - Bit Visualization", *result['bits'])
+        self._show_profile(result, plot_stages)
+
+    def _error_analytics(self, algo):
+        # one accumulator per codec, kept for the session, so the plots
+        # aggregate every run instead of showing the last one
+        if algo not in self.error_analytics:
+            from ecc.error_analytics import ErrorAnalytics
+            syndrome_weight = None
+            if algo == "Hamming Code":
+                from ecc.frame_codecs import make_codec
+                syndrome_weight = make_codec('hamming', frame_bits=4).syndrome_weight
+            self.error_analytics[algo] = ErrorAnalytics(syndrome_weight=syndrome_weight)
+        return self.error_analytics[algo]
+
+    def closeEvent(self, event):
+        self.workers.cancel_all()
+        self.workers.wait()
+        super().closeEvent(event)
 
-            labels = ["Encoded", "Noisy", "Decoded"]
-            sequences = [encoded, noisy, conv_encode(decoded)]
-            highlights = [[False]*len(encoded) for _ in range(3)]
-
-            plot_error_patterns(data, noisy, decoded)
-
-        elif algo == "🔀 Compare All (Side-by-Side)":
-            result = "[COMPARISON MODE]\n\n"
-
-            if len(data) == 4 and all(c in '01' for c in data):
-                encoded = hamming_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded, err_pos = hamming_decode(noisy)
-                status = "✅" if decoded == data else "❌"
-                result += f"🔹 Hamming Code: {status}\n"
-
-            if all(c in '01' for c in data):
-                encoded = conv_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded = conv_decode(noisy)
-                status = "✅" if decoded == data else "❌"
-                result += f"🔹 Convolutional Code: {status}\n"
-
-            if data and not all(c in '01' for c in data):
-                encoded = rs_encode(data)
-                noisy = self.apply_noise(encoded)
-                decoded, error = rs_decode(noisy)
-                status = "✅" if decoded == data else "❌"
-                result += f"🔹 Reed-Solomon Code: {status}\n"
-            else:
-                result += "🔹 Reed-Solomon Code: Skipped (binary input)\n"
-
-        self.output_text.setText(result.strip())
-
-        if labels and sequences:
-            visualize_bits(f"{algo} - Bit Visualization", labels, sequences, highlights)
-        
-        
 
 def launch_app():
     app = QApplication(sys.argv)
     window = ECCWindow()
     window.show()
+    # after the first event loop pass, so the window is painted first
+    QTimer.singleShot(0, lambda: threading.Thread(target=warm_up, name='warm-up', daemon=True).start())
     sys.exit(app.exec_())
@@ -0,0 +1,98 @@
+# ui/workers.py
+# Background execution of simulation jobs for the GUI. A job is a plain
+# function called on a QThreadPool thread with a `progress(done, total)`
+# callback; results, progress and errors come back to the GUI thread as
+# queued Qt signals. progress() doubles as the cancellation point: once a
+# task is cancelled the next call raises Cancelled and the job unwinds.
+import threading
+import traceback
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class Cancelled(Exception):
+    pass
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(int, int)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+
+class Task(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+        self._cancel = threading.Event()
+        self.setAutoDelete(False)  # the pool keeps a reference until finished
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_cancelled(self):
+        return self._cancel.is_set()
+
+    def progress(self, done, total):
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.signals.progress.emit(done, total)
+
+    def run(self):
+        try:
+            if self._cancel.is_set():
+                raise Cancelled()
+            result = self.fn(*self.args, progress=self.progress, **self.kwargs)
+        except Cancelled:
+            self.signals.cancelled.emit()
+        except Exception:
+            self.signals.error.emit(traceback.format_exc())
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class WorkerPool(QObject):
+    """Queue of Tasks on a QThreadPool; `pending` reports how many are
+    queued or running whenever that changes."""
+
+    pending = pyqtSignal(int)
+
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            self.pool.setMaxThreadCount(max_threads)
+        self._tasks = set()
+
+    def submit(self, fn, *args, on_result=None, on_progress=None, on_error=None,
+               on_cancelled=None, **kwargs):
+        task = Task(fn, *args, **kwargs)
+        for signal, slot in ((task.signals.result, on_result),
+                             (task.signals.progress, on_progress),
+                             (task.signals.error, on_error),
+                             (task.signals.cancelled, on_cancelled)):
+            if slot:
+                signal.connect(slot)
+        task.signals.finished.connect(lambda: self._done(task))
+        self._tasks.add(task)
+        self.pool.start(task)
+        self.pending.emit(len(self._tasks))
+        return task
+
+    def _done(self, task):
+        self._tasks.discard(task)
+        self.pending.emit(len(self._tasks))
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def wait(self, msecs=-1):
+        return self.pool.waitForDone(msecs)